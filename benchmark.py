@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+
+"""Measure the throughput of filters, CLI splitting and GUI loading on synthetic logs"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.buffer import Buffer, ByteBuffer
+from src.cli import filter_logs
+from src.filter import Filter
+from src.loader import FileLoader
+from src.matcher import Matcher
+
+WORDS = (
+    "request handled user session worker queue cache miss hit timeout retry "
+    "connection opened closed payload bytes status ok failed started stopped"
+).split()
+
+# Keywords planted into matching lines; regexes are built to match them as well
+KEYWORD = "amet"
+REGEX = r"etc:\s*-?\d+"
+MATCH_TEXT = f"{KEYWORD} etc: 42"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size-mb", type=float, default=20.0, help="Size of the synthetic log (default: 20)")
+    parser.add_argument("--line-length", type=int, default=120, help="Mean line length in bytes (default: 120)")
+    parser.add_argument(
+        "--line-length-stddev", type=int, default=40, help="Standard deviation of the line length (default: 40)"
+    )
+    parser.add_argument(
+        "--match-ratio", type=float, default=0.05, help="Fraction of lines containing the keywords (default: 0.05)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--jobs", type=int, default=2, help="Worker processes for the --jobs run (default: 2)")
+    parser.add_argument(
+        "--startup-runs", type=int, default=10, help="Interpreter starts per startup check (default: 10)"
+    )
+    parser.add_argument(
+        "--startup-only", action="store_true", help="Only run the startup checks, without a synthetic log"
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON to this file")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        default=None,
+        help="Results JSON of an earlier run (--output); exit with status 1 if a startup check got slower",
+    )
+    parser.add_argument(
+        "--startup-tolerance",
+        type=float,
+        default=0.2,
+        help="Fraction a startup check may be slower than in --baseline (default: 0.2)",
+    )
+    return parser.parse_args()
+
+
+def generate_log(path: Path, size: int, line_length: int, stddev: int, match_ratio: float, seed: int) -> int:
+    """Write a synthetic timestamped log of about `size` bytes; returns the number of lines."""
+    rng = random.Random(seed)
+    stamp = datetime(2026, 1, 1)
+    written = 0
+    count = 0
+
+    with path.open("w", encoding="utf-8") as f:
+        while written < size:
+            stamp += timedelta(milliseconds=rng.randint(1, 500))
+            parts = [
+                stamp.isoformat(timespec="milliseconds"),
+                rng.choice(("INFO", "DEBUG", "WARN")),
+                f"w{rng.randint(0, 9)}",
+            ]
+            if rng.random() < match_ratio:
+                parts.append(MATCH_TEXT)
+
+            target = max(len(parts[0]) + 10, int(rng.gauss(line_length, stddev)))
+            length = sum(len(p) + 1 for p in parts)
+            while length < target:
+                word = rng.choice(WORDS)
+                parts.append(word)
+                length += len(word) + 1
+
+            line = " ".join(parts) + "\n"
+            f.write(line)
+            written += len(line)
+            count += 1
+
+    return count
+
+
+def measure(name: str, func, lines: int, size: int) -> dict:
+    """Run `func` once and report its throughput."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    result = {
+        "name": name,
+        "seconds": round(elapsed, 4),
+        "lines_per_s": round(lines / elapsed),
+        "mb_per_s": round(size / elapsed / 1e6, 2),
+    }
+    print(
+        f"{name:<32} {result['seconds']:>8.3f} s {result['lines_per_s']:>12,} lines/s {result['mb_per_s']:>8.2f} MB/s"
+    )
+    return result
+
+
+def bench_filters(lines: list[str], size: int) -> list[dict]:
+    settings = {
+        "substring": [{"reg": False, "keyword": KEYWORD}, {"reg": False, "keyword": "etc:"}],
+        "regex": [{"reg": True, "keyword": KEYWORD}, {"reg": True, "keyword": REGEX}],
+    }
+    results = []
+
+    for kind, keywords in settings.items():
+        for all_match in (True, False):
+            flt = Filter(keywords, all_match)
+            label = f"Filter.match {kind} {'all' if all_match else 'any'}"
+            results.append(measure(label, lambda: [flt.match(line) for line in lines], len(lines), size))
+
+    filters = {
+        f"{kind}-{mode}": Filter(keywords, mode == "all")
+        for kind, keywords in settings.items()
+        for mode in ("all", "any")
+    }
+    matcher = Matcher(filters)
+    results.append(
+        measure("Matcher.match 4 filters", lambda: [matcher.match(line) for line in lines], len(lines), size)
+    )
+    return results
+
+
+def bench_buffer(lines: list[str], size: int) -> list[dict]:
+    results = []
+    for save_first in (True, False):
+        buf = Buffer(capacity=1000, save_first=save_first)
+        label = f"Buffer.add {'first' if save_first else 'last'} N"
+        results.append(measure(label, lambda: [buf.add(line) for line in lines], len(lines), size))
+    encoded = [line.encode("utf-8") for line in lines]
+    for save_first in (True, False):
+        byte_buf = ByteBuffer(capacity=1000, save_first=save_first, max_bytes=1 << 20)
+        label = f"ByteBuffer.add {'first' if save_first else 'last'} N"
+        results.append(measure(label, lambda: [byte_buf.add(line) for line in encoded], len(lines), size))
+    return results
+
+
+def bench_split(log: Path, workdir: Path, lines: int, size: int, jobs: int) -> list[dict]:
+    filters = {
+        "amet": Filter([{"reg": False, "keyword": KEYWORD}], True),
+        "etc": Filter([{"reg": True, "keyword": REGEX}], True),
+        "amet|etc": Filter([{"reg": False, "keyword": KEYWORD}, {"reg": True, "keyword": REGEX}], False),
+    }
+    runs = {
+        "filter_logs": {},
+        "filter_logs --mmap": {"use_mmap": True},
+        f"filter_logs --jobs {jobs}": {"jobs": jobs},
+    }
+    return [
+        measure(label, lambda: filter_logs(filters, log, workdir / "out", **kwargs), lines, size)
+        for label, kwargs in runs.items()
+    ]
+
+
+def bench_index(log: Path, workdir: Path, lines: int, size: int) -> list[dict]:
+    """Build, save and load the sidecar index, then filter with it warm, for a common and an absent keyword."""
+    from src.index import LogIndex
+
+    LogIndex.sidecar_path(log).unlink(missing_ok=True)
+    results = []
+    index = None
+
+    def build():
+        nonlocal index
+        index = LogIndex.build(log)
+
+    results.append(measure("LogIndex.build", build, lines, size))
+    results.append(measure("LogIndex.save", lambda: index.save(log), lines, size))
+    results.append(measure("LogIndex.load", lambda: LogIndex.load(log), lines, size))
+
+    runs = {
+        "filter_logs --index": {"amet": Filter([{"reg": False, "keyword": KEYWORD}], True)},
+        "filter_logs --index (absent)": {"absent": Filter([{"reg": False, "keyword": "quota exceeded"}], True)},
+    }
+    for label, filters in runs.items():
+        results.append(measure(label, lambda: filter_logs(filters, log, workdir / "out", use_index=True), lines, size))
+    return results
+
+
+def bench_loader(log: Path, lines: int, size: int) -> list[dict]:
+    filters = {
+        "amet": Filter([{"reg": False, "keyword": KEYWORD}], True),
+        "etc": Filter([{"reg": True, "keyword": REGEX}], True),
+    }
+
+    def load():
+        loader = FileLoader(log, filters, keep_original=True, use_index=False, batch_lines=1000)
+        loader.start()
+        loader.join()
+
+    return [measure("GUI FileLoader", load, lines, size)]
+
+
+def bench_startup(runs: int) -> list[dict]:
+    """Time fresh interpreters importing the CLI and showing its help; the fastest run counts."""
+    commands = {
+        "python (baseline)": ["-c", "pass"],
+        "import src.cli": ["-c", "import src.cli"],
+        "main_cli.py --help": ["main_cli.py", "--help"],
+        "main.py --cli --help": ["main.py", "--cli", "--help"],
+    }
+    results = []
+    for name, args in commands.items():
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, *args], cwd=Path(__file__).parent, capture_output=True, check=True)
+            times.append(time.perf_counter() - start)
+        result = {"name": f"startup {name}", "seconds": round(min(times), 4)}
+        print(f"{result['name']:<32} {result['seconds']:>8.3f} s")
+        results.append(result)
+    return results
+
+
+def compare_startup(results: list[dict], baseline: dict, tolerance: float) -> list[str]:
+    """Names of the startup checks slower than in the `baseline` report by more than `tolerance`."""
+    before = {result["name"]: result["seconds"] for result in baseline["results"]}
+    slower = []
+    for result in results:
+        name = result["name"]
+        if name.startswith("startup ") and name in before and result["seconds"] > before[name] * (1 + tolerance):
+            print(f"{name} got slower: {result['seconds']:.3f} s, baseline {before[name]:.3f} s")
+            slower.append(name)
+    return slower
+
+
+def git_commit() -> None | str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    args = parse_args()
+    # Read first, so a bad path fails before the long runs
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline is not None else None
+
+    results = []
+    count = None
+    if not args.startup_only:
+        with tempfile.TemporaryDirectory() as tmp:
+            workdir = Path(tmp)
+            log = workdir / "synthetic.log"
+            count = generate_log(
+                log, int(args.size_mb * 1e6), args.line_length, args.line_length_stddev, args.match_ratio, args.seed
+            )
+            size = log.stat().st_size
+            print(f"Synthetic log: {count:,} lines, {size / 1e6:.1f} MB, match ratio {args.match_ratio}")
+
+            lines = log.read_text(encoding="utf-8").splitlines()
+
+            results += bench_filters(lines, size)
+            results += bench_buffer(lines, size)
+            results += bench_split(log, workdir, count, size, args.jobs)
+            results += bench_index(log, workdir, count, size)
+            results += bench_loader(log, count, size)
+    results += bench_startup(args.startup_runs)
+
+    report = {
+        "commit": git_commit(),
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "parameters": {
+            "size_mb": args.size_mb,
+            "line_length": args.line_length,
+            "line_length_stddev": args.line_length_stddev,
+            "match_ratio": args.match_ratio,
+            "seed": args.seed,
+            "lines": count,
+        },
+        "results": results,
+    }
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=4), encoding="utf-8")
+        print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        if compare_startup(results, baseline, args.startup_tolerance):
+            sys.exit(1)
+        print(f"Startup within {args.startup_tolerance:.0%} of the baseline {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
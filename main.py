@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 
-from src.utils import is_headless
+import sys
+
+from src.utils import has_display
 
 
 def run_cli():
@@ -9,19 +11,41 @@ def run_cli():
     main_cli()
 
 
-def run_gui():
+def run_gui(fallback: bool = True):
     try:
         from src.gui import main_gui
 
         main_gui()
     except Exception as e:
+        if not fallback:
+            raise
         print("GUI mode failed to start. Falling back to CLI.")
         print(f"Reason: {e}")
         run_cli()
 
 
+def select_mode(argv: list[str]) -> tuple[str, bool]:
+    """
+    Return the mode ("gui" or "cli") and whether it was chosen explicitly,
+    removing a --gui/--cli switch from `argv`.
+
+    Without a switch, arguments mean the CLI (the GUI takes none), and the
+    GUI needs a display. Only environment variables are checked, so scripted
+    runs never pay for importing Tkinter or probing the display.
+    """
+    for switch in ("--gui", "--cli"):
+        if switch in argv:
+            argv.remove(switch)
+            return switch[2:], True
+    if len(argv) > 1 or not has_display():
+        return "cli", False
+    return "gui", False
+
+
 if __name__ == "__main__":
-    if is_headless():
+    mode, explicit = select_mode(sys.argv)
+    if mode == "cli":
         run_cli()
     else:
-        run_gui()
+        # An explicit --gui reports why the GUI failed instead of falling back
+        run_gui(fallback=not explicit)
@@ -0,0 +1,166 @@
+import json
+import sys
+import zlib
+from array import array
+from itertools import accumulate
+from pathlib import Path
+
+from src.context import ContextTracker
+from src.filter import Filter
+from src.matcher import Matcher
+from src.scan import iter_offset_lines
+from src.utils import make_name_filename
+
+MANIFEST = "manifest.json"
+OFFSETS = "offsets.bin"
+VERSION = 1
+
+
+def write_bitmaps(
+    filters: dict[str, Filter],
+    input_file: Path,
+    output_dir: Path,
+    ranges: None | list[tuple[int, int]] = None,
+    matcher=None,
+) -> None:
+    """
+    Write the match results as columns instead of text copies: the offsets of
+    all non-blank input lines once (`offsets.bin`), and one bitmap per filter
+    (`<filter>.bitmap`) whose bit i is set if the filter matches line i. Both
+    are zlib-compressed; `MatchBitmaps` reads them back. Context lines of
+    filters with `before`/`after` are set like in the text outputs.
+
+    Parameters
+    ----------
+    filters : dict[str, Filter]
+        Filters as returned by `load_filters`.
+    input_file : Path
+        Uncompressed input, read again when lines are materialized.
+    output_dir : Path
+        Existing directory to write to.
+    ranges : list of (start, end) or None
+        Byte ranges to scan; None scans the whole file. Must be None with
+        context lines, which need every line.
+    matcher : Matcher or None
+        Matcher to use instead of one built from `filters`, e.g. a profiler.
+    """
+    if matcher is None:
+        matcher = Matcher.cached(filters)
+    if ranges is None:
+        ranges = [(0, input_file.stat().st_size)]
+
+    context = ContextTracker.for_filters(filters)
+    offsets = array("Q")
+    hits = [array("Q") for _ in filters]
+    with input_file.open("rb") as f:
+        for start, end in ranges:
+            for offset, line in iter_offset_lines(f, start, end):
+                if line.isspace():
+                    continue
+                number = len(offsets)
+                offsets.append(offset)
+                if context is None:
+                    for idx in matcher.match(line.rstrip("\n")):
+                        hits[idx].append(number)
+                else:
+                    # Line numbers stand for the lines, so context costs no text
+                    for idx, item in context.add(number, matcher.match(line.rstrip("\n"))):
+                        hits[idx].append(item)
+
+    # Deltas (line lengths) compress far better than absolute offsets
+    deltas = array("Q", [offsets[0]] if offsets else [])
+    deltas.extend(b - a for a, b in zip(offsets, offsets[1:]))
+    (output_dir / OFFSETS).write_bytes(zlib.compress(deltas.tobytes()))
+
+    files = {}
+    for name, numbers in zip(filters, hits):
+        bits = bytearray((len(offsets) + 7) // 8)
+        for number in numbers:
+            bits[number >> 3] |= 1 << (number & 7)
+        files[name] = f"{make_name_filename(name)}.bitmap"
+        (output_dir / files[name]).write_bytes(zlib.compress(bytes(bits)))
+
+    stat = input_file.stat()
+    manifest = {
+        "version": VERSION,
+        "source": str(input_file.resolve()),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "lines": len(offsets),
+        "byteorder": sys.byteorder,
+        "filters": files,
+    }
+    (output_dir / MANIFEST).write_text(json.dumps(manifest, indent=4), encoding="utf-8")
+
+
+class MatchBitmaps:
+    def __init__(self, directory: Path, source: None | Path = None) -> None:
+        """
+        Read match bitmaps written by `write_bitmaps`.
+
+        Filter results are exposed as int bitmasks (bit i = line i), so they
+        combine with Python's operators, e.g.
+        `bitmaps.lines(bitmaps.mask("se") & ~bitmaps.mask("amet"))`.
+
+        Parameters
+        ----------
+        directory : Path
+            Directory written by `write_bitmaps`.
+        source : Path or None
+            Input file the lines are read from; default: the path recorded
+            when writing. It must not have changed since.
+        """
+        self._directory = directory
+        manifest = json.loads((directory / MANIFEST).read_text(encoding="utf-8"))
+        if manifest["version"] != VERSION:
+            raise ValueError(f"Unsupported bitmap version {manifest['version']} in {directory}.")
+
+        self.source = Path(manifest["source"]) if source is None else source
+        stat = self.source.stat()
+        if (stat.st_size, stat.st_mtime_ns) != (manifest["size"], manifest["mtime_ns"]):
+            raise ValueError(f"{self.source} changed since the bitmaps in {directory} were written.")
+
+        self.names = list(manifest["filters"])
+        self._files = manifest["filters"]
+        self._masks = {}
+
+        deltas = array("Q")
+        deltas.frombytes(zlib.decompress((directory / OFFSETS).read_bytes()))
+        if manifest["byteorder"] != sys.byteorder:
+            deltas.byteswap()
+        self.offsets = array("Q", accumulate(deltas))
+        self.all_mask = (1 << len(self.offsets)) - 1
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def mask(self, name: str) -> int:
+        """Bitmask of the lines matched by the filter."""
+        if name not in self._masks:
+            bits = zlib.decompress((self._directory / self._files[name]).read_bytes())
+            self._masks[name] = int.from_bytes(bits, "little")
+        return self._masks[name]
+
+    def numbers(self, mask: int):
+        """Yield the line numbers set in the mask, in order; `~` inverts within the lines."""
+        mask &= self.all_mask
+        for i, byte in enumerate(mask.to_bytes((len(self.offsets) + 7) // 8, "little")):
+            while byte:
+                low = byte & -byte
+                yield (i << 3) + low.bit_length() - 1
+                byte ^= low
+
+    def count(self, mask: int) -> int:
+        """Number of lines set in the mask."""
+        return bin(mask & self.all_mask).count("1")
+
+    def lines(self, mask: int):
+        """Yield the lines set in the mask from the source file, without "\\n"."""
+        with self.source.open("rb") as f:
+            for number in self.numbers(mask):
+                f.seek(self.offsets[number])
+                yield f.readline().rstrip(b"\r\n").decode("utf-8", errors="ignore")
+
+    def filter_lines(self, name: str):
+        """Yield the lines matched by the filter."""
+        return self.lines(self.mask(name))
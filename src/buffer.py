@@ -1,3 +1,4 @@
+from array import array
 from collections import deque
 
 
@@ -78,3 +79,156 @@ class Buffer:
         Developer-friendly representation showing configuration and contents.
         """
         return f"Buffer(capacity={self.capacity}, save_first={self.save_first}, data={self.get()})"
+
+
+class ByteBuffer:
+    def __init__(self, capacity: int, save_first: bool, max_bytes: int):
+        """
+        A `Buffer` for encoded lines that is limited by bytes as well as by
+        the number of lines. It stores
+        - the longest prefix of the lines that fits both limits (save_first=True), or
+        - the longest suffix of the lines that fits both limits (save_first=False).
+
+        Lines are stored back to back in one preallocated bytearray, each
+        followed by "\n", with an array of their start offsets; there is no
+        Python object per line. Instead of wrapping around, live lines are
+        moved to the front when the end of the storage is reached, so every
+        line and the joined content stay contiguous and `get` and
+        `get_joined` can return views instead of copies.
+
+        Parameters
+        ----------
+        capacity : int
+            Maximum number of lines to store.
+        save_first : bool
+            If True, keep the first lines and ignore the rest once one does not fit.
+            If False, keep the last lines, dropping the oldest ones.
+        max_bytes : int
+            Maximum size of the stored lines, counting one "\n" per line.
+            Storage takes twice as much, allocated up front.
+        """
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if max_bytes <= 0:
+            raise ValueError("max_bytes must be positive")
+
+        self.capacity = capacity
+        self.save_first = save_first
+        self.max_bytes = max_bytes
+
+        # Twice the budget, so lines are only moved once per `max_bytes` appended bytes
+        self._data = bytearray(2 * max_bytes)
+        self._view = memoryview(self._data)
+        # Start offsets of the stored lines from index `_first` on; `_end` is the
+        # end of the newest line
+        self._starts = array("Q")
+        self._first = 0
+        self._end = 0
+        self._full = False
+
+    def add(self, line: bytes):
+        """
+        Add a line (bytes without line break) to the buffer.
+
+        Behavior:
+        - save_first=True:
+            Append until a line does not fit, then ignore all further lines.
+        - save_first=False:
+            Append always, dropping the oldest lines until the new one fits;
+            a line longer than `max_bytes` leaves the buffer empty.
+        """
+        size = len(line) + 1
+
+        if self.save_first:
+            if self._full:
+                return
+            if len(self) >= self.capacity or self.nbytes + size > self.max_bytes:
+                self._full = True
+                return
+        else:
+            if size > self.max_bytes:
+                # No suffix ending with this line fits
+                self.clear()
+                return
+            starts = self._starts
+            first = self._first
+            count = len(starts)
+            # Oldest start that leaves room for the new line
+            lowest = self._end + size - self.max_bytes
+            while first < count and (count - first >= self.capacity or starts[first] < lowest):
+                first += 1
+            if first > 1024 and first * 2 > count:
+                del starts[:first]
+                first = 0
+            self._first = first
+            if self._end + size > len(self._data):
+                self._compact()
+
+        start = self._end
+        end = start + size - 1
+        # Same-size slice assignments never resize, which views from `get` would forbid
+        self._data[start:end] = line
+        self._data[end] = 10
+        self._starts.append(start)
+        self._end = end + 1
+
+    def _compact(self):
+        """Move the stored lines to the front of the storage."""
+        if not len(self):
+            self.clear()
+            return
+        base = self._starts[self._first]
+        size = self._end - base
+        self._data[:size] = self._data[base : self._end]
+        self._starts = array("Q", (start - base for start in self._starts[self._first :]))
+        self._first = 0
+        self._end = size
+
+    def get(self):
+        """
+        Return the stored lines as a list of memoryviews, without line breaks.
+
+        The views do not copy the data; they are only valid until the next
+        `add` or `clear`, which may overwrite or move the lines.
+        """
+        starts = self._starts[self._first :]
+        ends = starts[1:]
+        ends.append(self._end)
+        view = self._view
+        return [view[start : end - 1] for start, end in zip(starts, ends)]
+
+    def get_joined(self):
+        """
+        Return the stored lines, each followed by "\n", as one memoryview,
+        ready for a single file write (or `str(view, "utf-8")` for a widget).
+        Valid until the next `add` or `clear`, like `get`.
+        """
+        if not len(self):
+            return self._view[:0]
+        return self._view[self._starts[self._first] : self._end]
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the stored lines, counting one "\n" per line."""
+        return self._end - self._starts[self._first] if len(self) else 0
+
+    def clear(self):
+        """Clear all stored lines."""
+        self._starts = array("Q")
+        self._first = 0
+        self._end = 0
+        self._full = False
+
+    def __len__(self):
+        """Return the number of lines currently stored."""
+        return len(self._starts) - self._first
+
+    def __repr__(self):
+        """
+        Developer-friendly representation showing configuration and contents.
+        """
+        data = [bytes(line) for line in self.get()]
+        return (
+            f"ByteBuffer(capacity={self.capacity}, save_first={self.save_first}, "
+            f"max_bytes={self.max_bytes}, data={data})"
+        )
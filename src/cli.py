@@ -1,15 +1,31 @@
 import argparse
+import io
+import os
 import shutil
+import threading
+from datetime import datetime
 from pathlib import Path
 
+from src.compression import SUFFIXES, detect_compression, open_log, open_output
+from src.context import BEFORE_BYTES, ContextTracker
 from src.filter import Filter
-from src.utils import load_filters, make_name_filename
+from src.matcher import Matcher
+from src.scan import iter_mmap_lines, iter_offset_lines, iter_range_lines
+from src.timerange import TimestampParser, clip_ranges, iter_time_window, time_window
+from src.utils import load_config, load_filters, make_name_filename
+from src.writer import OutputWriter
+
+# Modules only some modes need (multiprocessing, mmap, bitmaps, the index,
+# profiling, follow mode) are imported where they are used: the CLI is started
+# from cron many times a day, and every plain run would pay for them.
 
 
 def parse_cli_args():
     parser = argparse.ArgumentParser(description="Process an input file and optionally specify an output directory.")
 
-    parser.add_argument("input_file", type=Path, help="Path to the input file")
+    parser.add_argument(
+        "input_file", type=Path, help="Path to the input file (with --batch: a directory or a quoted glob pattern)"
+    )
     parser.add_argument(
         "output_dir",
         nargs="?",
@@ -17,16 +33,299 @@ def parse_cli_args():
         type=Path,
         help="Output directory (default: ./output)",
     )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        help="Number of worker processes; the input is split into newline-aligned byte ranges (default: 1)",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Memory-map the input and match raw bytes; only matching lines are copied, and they are written unchanged",
+    )
+    parser.add_argument(
+        "--index",
+        action="store_true",
+        help="Build or reuse a sidecar index (<input>.lfidx) and only scan blocks that can contain matches",
+    )
+    parser.add_argument(
+        "--follow",
+        "-f",
+        action="store_true",
+        help="Keep watching the input like `tail -F` and append new matches until interrupted (Ctrl+C)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Seconds between two checks for new lines in --follow mode (default: 1.0)",
+    )
 
-    return parser.parse_args()
+    parser.add_argument(
+        "--compress",
+        choices=sorted(SUFFIXES),
+        default=None,
+        help="Compress the output files with this format (zstd needs the 'zstandard' package)",
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        default=None,
+        metavar="TIME",
+        help="Only filter lines logged at or after this ISO time, e.g. 2026-01-01T10:00; the start is found by "
+        "binary search on the timestamps (timestamp_regex / timestamp_format in config.json)",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.fromisoformat,
+        default=None,
+        metavar="TIME",
+        help="Only filter lines logged at or before this ISO time",
+    )
+    parser.add_argument(
+        "--bitmap",
+        action="store_true",
+        help="Instead of one text file per filter, write the offsets of all lines once plus one compressed bitmap "
+        "per filter; read them with src.bitmap.MatchBitmaps",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Filter every file of a directory or glob pattern with the same filters, spread over --jobs worker "
+        "processes; outputs go to one subdirectory per input file",
+    )
+    parser.add_argument(
+        "--merge",
+        action="store_true",
+        help="With --batch: write one output file per filter with the matches of all inputs, in input order",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="REPORT",
+        help="Time every filter and keyword and print a report ranked by cost, or write it to REPORT "
+        "(JSON if it ends in .json); slow, runs in one process",
+    )
+    parser.add_argument(
+        "--stats",
+        nargs="?",
+        const="-",
+        default=None,
+        metavar="SUMMARY",
+        help="Only count the matches of each filter and note their first and last offsets; print the summary as "
+        "JSON or write it to SUMMARY (CSV if it ends in .csv). No output files are written",
+    )
+    parser.add_argument(
+        "--histogram",
+        action="store_true",
+        help="With --stats: also count the matches per minute, reading the timestamps as configured in config.json",
+    )
 
+    args = parser.parse_args()
+    if args.follow and (args.jobs > 1 or args.mmap or args.index):
+        parser.error("--follow cannot be combined with --jobs, --mmap or --index")
+    if args.follow and args.profile is not None:
+        parser.error("--follow cannot be combined with --profile")
+    if (args.follow or args.batch) and (args.since is not None or args.until is not None):
+        parser.error("--since and --until cannot be combined with --follow or --batch")
+    if args.batch and (args.follow or args.mmap or args.index or args.profile is not None):
+        parser.error("--batch cannot be combined with --follow, --mmap, --index or --profile")
+    if args.bitmap and (args.follow or args.batch or args.compress is not None):
+        parser.error("--bitmap cannot be combined with --follow, --batch or --compress")
+    if args.merge and not args.batch:
+        parser.error("--merge needs --batch")
+    if args.stats is not None and (
+        args.follow or args.batch or args.bitmap or args.profile is not None or args.compress is not None
+    ):
+        parser.error("--stats cannot be combined with --follow, --batch, --bitmap, --profile or --compress")
+    if args.histogram and args.stats is None:
+        parser.error("--histogram needs --stats")
+
+    return args
+
+
+def split_ranges(input_file: Path, count: int, start: int = 0, end: None | int = None) -> list[tuple[int, int]]:
+    """
+    Cut the file, or its byte range [start, end), into at most `count` byte
+    ranges [start, end), each beginning at the start of a line. `start` must
+    be the start of a line.
+    """
+    size = input_file.stat().st_size if end is None else end
+    bounds = [start]
+
+    with input_file.open("rb") as f:
+        for i in range(1, count):
+            target = start + (size - start) * i // count
+            if target <= bounds[-1]:
+                continue
+            # Move the boundary to the start of the next line
+            f.seek(target - 1)
+            f.readline()
+            pos = f.tell()
+            if bounds[-1] < pos < size:
+                bounds.append(pos)
+
+    bounds.append(size)
+    return [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if lo < hi]
+
+
+# Input lines between two checks whether the writer should flush (a power of two minus one)
+FLUSH_CHECK_MASK = 1023
+
+
+def write_matches(matcher: Matcher, lines, writer: OutputWriter, context: None | ContextTracker = None) -> int:
+    """
+    Run every line through the matcher and buffer it for the outputs of all
+    matching filters, with the context lines of `context` if given.
+    Returns the number of lines read.
+    """
+    buffers = writer.buffers
+    count = 0
+    for count, line in enumerate(lines, 1):
+        if not count & FLUSH_CHECK_MASK:
+            buffers = writer.maybe_flush()
+        if line.isspace():
+            continue
+
+        stripped = line.rstrip("\n")
+
+        # Match all filters at once
+        if context is None:
+            for idx in matcher.match(stripped):
+                buffers[idx].append(stripped)
+        else:
+            for idx, item in context.add(stripped, matcher.match(stripped)):
+                buffers[idx].append(item)
+
+    return count
+
+
+def write_matches_bytes(matcher: Matcher, lines, writer: OutputWriter) -> None:
+    """Same as `write_matches`, for stripped `bytes` lines and a binary writer."""
+    buffers = writer.buffers
+    for count, line in enumerate(lines, 1):
+        if not count & FLUSH_CHECK_MASK:
+            buffers = writer.maybe_flush()
+        if not line or line.isspace():
+            continue
+
+        for idx in matcher.match(line):
+            buffers[idx].append(line)
 
-def filter_logs(filters: dict[str, Filter], input_file: Path, output_dir: Path) -> None:
-    # Validate input
-    if not input_file.exists():
-        raise FileNotFoundError(f"Input file {input_file} doesn't exist.")
 
-    # Reset output directory
+def _filter_mmap(
+    filters: dict[str, Filter],
+    input_file: Path,
+    ranges: list[tuple[int, int]],
+    output_paths,
+    compression: None | str = None,
+) -> None:
+    """Filter byte ranges of the memory-mapped input into the given output paths."""
+    import mmap
+
+    matcher = Matcher.cached(filters, binary=True)
+
+    with OutputWriter(output_paths, compression, binary=True) as writer, input_file.open("rb") as f:
+        # mmap cannot map an empty file
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for start, end in ranges:
+                write_matches_bytes(matcher, iter_mmap_lines(mm, matcher.scan_gate, start, end), writer)
+
+
+def _filter_ranges(
+    filters: dict[str, Filter],
+    input_file: Path,
+    ranges: list[tuple[int, int]],
+    output_paths,
+    compression: None | str = None,
+    matcher=None,
+) -> None:
+    """Filter byte ranges of the input into the given output paths, with `matcher` or a new `Matcher`."""
+    if matcher is None:
+        matcher = Matcher.cached(filters)
+    context = ContextTracker.for_filters(filters, BEFORE_BYTES)
+
+    with OutputWriter(output_paths, compression) as writer, input_file.open("rb") as f:
+        for start, end in ranges:
+            write_matches(matcher, iter_range_lines(f, start, end), writer, context)
+
+
+def _filter_task(
+    filters: dict[str, Filter], input_file: Path, ranges: list[tuple[int, int]], part_dir: Path, use_mmap: bool
+) -> None:
+    """Worker: filter some byte ranges into one part file per filter."""
+    part_dir.mkdir(parents=True)
+    part_paths = [part_dir / f"{idx}.txt" for idx in range(len(filters))]
+
+    if use_mmap:
+        _filter_mmap(filters, input_file, ranges, part_paths)
+    else:
+        _filter_ranges(filters, input_file, ranges, part_paths)
+
+
+def _group_ranges(ranges: list[tuple[int, int]], count: int) -> list[list[tuple[int, int]]]:
+    """Split consecutive ranges into at most `count` groups of similar byte size, keeping their order."""
+    total = sum(end - start for start, end in ranges)
+    groups = [[]]
+    done = 0
+    for start, end in ranges:
+        if groups[-1] and done >= total * len(groups) / count:
+            groups.append([])
+        groups[-1].append((start, end))
+        done += end - start
+    return groups
+
+
+def _filter_parallel(
+    filters: dict[str, Filter],
+    input_file: Path,
+    output_dir: Path,
+    jobs: int,
+    use_mmap: bool,
+    ranges: None | list[tuple[int, int]],
+    compression: None | str,
+) -> None:
+    """Filter byte ranges in a process pool, then concatenate the parts in line order."""
+    if ranges is None:
+        groups = [[r] for r in split_ranges(input_file, jobs)]
+    else:
+        groups = _group_ranges(ranges, jobs)
+    parts_root = output_dir / ".parts"
+    part_dirs = [parts_root / str(i) for i in range(len(groups))]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    try:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [
+                pool.submit(_filter_task, filters, input_file, group, part_dir, use_mmap)
+                for group, part_dir in zip(groups, part_dirs)
+            ]
+            for future in futures:
+                future.result()
+
+        for idx, path in enumerate(output_paths(filters, output_dir)):
+            with open_output(path, compression, binary=True) as outfile:
+                for part_dir in part_dirs:
+                    with (part_dir / f"{idx}.txt").open("rb") as part:
+                        shutil.copyfileobj(part, outfile)
+    finally:
+        shutil.rmtree(parts_root, ignore_errors=True)
+
+
+def output_paths(filters: dict[str, Filter], output_dir: Path) -> list[Path]:
+    """One output file per filter; `open_output` adds the suffix of the output compression."""
+    return [output_dir / f"{make_name_filename(name)}.txt" for name in filters.keys()]
+
+
+def reset_output_dir(output_dir: Path) -> None:
+    """Remove and recreate the output directory."""
     if output_dir.exists():
         if not output_dir.is_dir():
             raise NotADirectoryError(f"Output path {output_dir} is a file.")
@@ -35,28 +334,307 @@ def filter_logs(filters: dict[str, Filter], input_file: Path, output_dir: Path)
 
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # Pre-open all output files
-    ordered_filters = list(filters.values())
-    output_files = [
-        (output_dir / f"{make_name_filename(name)}.txt").open("w", encoding="utf-8") for name in filters.keys()
+
+def follow_logs(
+    filters: dict[str, Filter],
+    input_file: Path,
+    output_dir: Path,
+    interval: float = 1.0,
+    stop: None | threading.Event = None,
+    compression: None | str = None,
+) -> None:
+    """
+    Filter the input like `filter_logs`, then keep following it: lines appended
+    later (also across log rotation) are filtered and appended to the outputs
+    once per `interval` seconds, until `stop` is set or Ctrl+C is pressed.
+    """
+    if input_file.exists() and detect_compression(input_file) is not None:
+        raise ValueError(f"Cannot follow the compressed file {input_file}.")
+
+    reset_output_dir(output_dir)
+
+    if stop is None:
+        stop = threading.Event()
+
+    matcher = Matcher.cached(filters)
+    context = ContextTracker.for_filters(filters, BEFORE_BYTES)
+    from src.follow import FileFollower
+
+    follower = FileFollower(input_file)
+    writer = OutputWriter(output_paths(filters, output_dir), compression)
+
+    try:
+        while True:
+            write_matches(matcher, (line for _, line in follower.poll()), writer, context)
+            if follower.reopened:
+                print(f"{input_file} was rotated or truncated; following the new file")
+            writer.flush(wait=True)
+
+            if stop.wait(interval):
+                break
+    except KeyboardInterrupt:
+        print("Stopped following.")
+    finally:
+        follower.close()
+        writer.close()
+
+
+def filter_logs(
+    filters: dict[str, Filter],
+    input_file: Path,
+    output_dir: Path,
+    jobs: int = 1,
+    use_mmap: bool = False,
+    use_index: bool = False,
+    compression: None | str = None,
+    profiler=None,
+    since: None | datetime = None,
+    until: None | datetime = None,
+    timestamps: None | TimestampParser = None,
+    bitmap: bool = False,
+    stats=None,
+) -> None:
+    """
+    Write the lines matched by each filter into one file per filter.
+
+    Compressed input (gzip, bz2, xz, zstd) is detected from its magic bytes
+    and decompressed while reading. `compression` compresses the outputs.
+    A `profiler` built from the same filters replaces the matcher and
+    collects timings; it needs a single process reading text.
+
+    `since` and `until` limit the lines to a time window, read with the
+    `timestamps` parser (default: ISO 8601 at the line start). The window
+    is found by binary search, or by reading compressed input up to it.
+
+    With `bitmap`, line offsets and one bitmap per filter are written
+    instead of text (see `write_bitmaps`); the input must be uncompressed.
+
+    With `stats` (a `MatchStats` of the same filters), matches are only
+    counted into it; nothing is written and `output_dir` is left alone.
+    """
+    # Validate input
+    if not input_file.exists():
+        raise FileNotFoundError(f"Input file {input_file} doesn't exist.")
+    if jobs < 1:
+        raise ValueError("jobs must be positive")
+
+    input_compression = detect_compression(input_file)
+    if bitmap and input_compression is not None:
+        raise ValueError("Bitmap output reads lines back by offset and needs an uncompressed input.")
+
+    if input_compression is not None and (jobs > 1 or use_mmap or use_index):
+        # Those modes need random access to the file
+        print(f"Input is {input_compression}-compressed; reading it as a stream without --jobs, --mmap or --index")
+        jobs, use_mmap, use_index = 1, False, False
+    if profiler is not None and (jobs > 1 or use_mmap):
+        print("Profiling runs in one process on decoded lines; ignoring --jobs and --mmap")
+        jobs, use_mmap = 1, False
+    if bitmap and (jobs > 1 or use_mmap):
+        print("Bitmap output runs in one process on decoded lines; ignoring --jobs and --mmap")
+        jobs, use_mmap = 1, False
+    if stats is not None and (jobs > 1 or use_mmap):
+        print("Statistics run in one process on decoded lines; ignoring --jobs and --mmap")
+        jobs, use_mmap = 1, False
+    has_context = any(flt.before or flt.after for flt in filters.values())
+    if has_context and stats is None and (jobs > 1 or use_mmap or use_index):
+        print("Context lines need one sequential pass over every line; ignoring --jobs, --mmap and --index")
+        jobs, use_mmap, use_index = 1, False, False
+
+    use_window = since is not None or until is not None
+    if timestamps is None:
+        timestamps = TimestampParser()
+
+    # Byte ranges to scan; None = the whole file
+    ranges = None
+    if use_index:
+        from src.index import LogIndex
+
+        ranges = LogIndex.open(input_file).candidate_ranges(filters)
+        print(f"Index selected {sum(end - start for start, end in ranges)} of {input_file.stat().st_size} bytes")
+    if use_window and input_compression is None:
+        start, end = time_window(input_file, timestamps, since, until)
+        print(f"Time window covers bytes {start} to {end} of {input_file.stat().st_size}")
+        if ranges is not None:
+            ranges = clip_ranges(ranges, start, end)
+        elif jobs > 1:
+            ranges = split_ranges(input_file, jobs, start, end)
+        else:
+            ranges = [(start, end)]
+
+    if stats is not None:
+        with open_log(input_file) as f:
+            if ranges is None:
+                lines = iter_offset_lines(f)
+                # Compressed input cannot seek to the window; read up to it instead
+                stats.add_lines(iter_time_window(lines, timestamps, since, until) if use_window else lines)
+            else:
+                for start, end in ranges:
+                    stats.add_lines(iter_offset_lines(f, start, end))
+        return
+
+    reset_output_dir(output_dir)
+    paths = output_paths(filters, output_dir)
+
+    if bitmap:
+        from src.bitmap import write_bitmaps
+
+        write_bitmaps(filters, input_file, output_dir, ranges, matcher=profiler)
+        return
+
+    if jobs > 1:
+        _filter_parallel(filters, input_file, output_dir, jobs, use_mmap, ranges, compression)
+        return
+
+    if use_mmap:
+        whole = [(0, input_file.stat().st_size)]
+        _filter_mmap(filters, input_file, whole if ranges is None else ranges, paths, compression)
+        return
+    if ranges is not None:
+        _filter_ranges(filters, input_file, ranges, paths, compression, matcher=profiler)
+        return
+
+    # One compiled scan serves every filter
+    matcher = Matcher.cached(filters) if profiler is None else profiler
+
+    # Matches are written on a background thread while matching goes on
+    with OutputWriter(paths, compression) as writer:
+        with io.TextIOWrapper(open_log(input_file), encoding="utf-8", errors="ignore") as f:
+            # Compressed input cannot seek to the window; read up to it instead
+            lines = iter_time_window(f, timestamps, since, until) if use_window else f
+            write_matches(matcher, lines, writer, ContextTracker.for_filters(filters, BEFORE_BYTES))
+
+
+def expand_inputs(source: Path, exclude: None | Path = None) -> tuple[Path, list[Path]]:
+    """
+    Return the base directory and the sorted files of a directory (recursively,
+    without hidden files and index sidecars) or of a glob pattern. Files inside
+    the directory `exclude` (e.g. the output directory) are left out.
+    """
+    if source.is_dir():
+        files = [
+            path
+            for path in source.rglob("*")
+            if path.is_file()
+            and not any(part.startswith(".") for part in path.relative_to(source).parts)
+            and not path.name.endswith(".lfidx")
+        ]
+        return source, sorted(_without_dir(files, exclude))
+
+    import glob
+
+    files = sorted(Path(name) for name in glob.glob(str(source), recursive=True) if os.path.isfile(name))
+    files = _without_dir(files, exclude)
+    if not files:
+        return source.parent, []
+    base = Path(os.path.commonpath([path.parent for path in files]))
+    return base, files
+
+
+def _without_dir(files: list[Path], directory: None | Path) -> list[Path]:
+    if directory is None:
+        return files
+    directory = directory.resolve()
+    return [path for path in files if not path.resolve().is_relative_to(directory)]
+
+
+# Filters and matcher of a batch worker process, built once by `_init_batch_worker`
+_batch_filters = None
+_batch_matcher = None
+
+
+def _init_batch_worker(filters: dict[str, Filter]) -> None:
+    global _batch_filters, _batch_matcher
+    _batch_filters = filters
+    _batch_matcher = Matcher.cached(filters)
+
+
+def _batch_task(input_file: Path, file_dir: Path, paths: list[Path], compression: None | str) -> dict:
+    """Worker: filter one file into the given output paths in `file_dir` and report what was read."""
+    summary = {"file": str(input_file), "bytes": 0, "lines": 0, "error": None}
+    try:
+        summary["bytes"] = input_file.stat().st_size
+        file_dir.mkdir(parents=True, exist_ok=True)
+        with OutputWriter(paths, compression) as writer:
+            with io.TextIOWrapper(open_log(input_file), encoding="utf-8", errors="ignore") as f:
+                context = ContextTracker.for_filters(_batch_filters, BEFORE_BYTES)
+                summary["lines"] = write_matches(_batch_matcher, f, writer, context)
+    except Exception as e:
+        summary["error"] = f"{type(e).__name__}: {e}"
+    return summary
+
+
+def filter_batch(
+    filters: dict[str, Filter],
+    source: Path,
+    output_dir: Path,
+    jobs: int = 1,
+    merge: bool = False,
+    compression: None | str = None,
+) -> list[dict]:
+    """
+    Filter every file of a directory or glob pattern (see `expand_inputs`).
+
+    Files are spread over `jobs` worker processes, each compiling the filters
+    once. Outputs go to `output_dir/<path relative to the base>/`, or with
+    `merge` into one file per filter holding the matches of all files in
+    input order. Returns one summary per file with the bytes and lines read;
+    a file that fails is reported with its error and the others go on.
+    """
+    if jobs < 1:
+        raise ValueError("jobs must be positive")
+
+    # Outputs of an earlier run inside the source are not inputs
+    base, files = expand_inputs(source, exclude=output_dir)
+    if not files:
+        raise FileNotFoundError(f"No input files match {source}.")
+
+    reset_output_dir(output_dir)
+    if merge:
+        # Plain part files, concatenated (and compressed) at the end
+        file_dirs = [output_dir / ".parts" / str(i) for i in range(len(files))]
+        task_compression = None
+    else:
+        file_dirs = [output_dir / path.relative_to(base) for path in files]
+        task_compression = compression
+    tasks = [
+        (path, file_dir, output_paths(filters, file_dir), task_compression) for path, file_dir in zip(files, file_dirs)
     ]
 
     try:
-        with input_file.open("r", encoding="utf-8", errors="ignore") as f:
-            for line in f:
-                if line.isspace():
-                    continue
-
-                stripped = line.rstrip("\n")
-
-                # Match each filter
-                for flt, outfile in zip(ordered_filters, output_files):
-                    if flt.match(stripped):
-                        outfile.write(stripped)
-                        outfile.write("\n")
+        if jobs == 1:
+            _init_batch_worker(filters)
+            summaries = [_batch_task(*task) for task in tasks]
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker, initargs=(filters,)) as pool:
+                summaries = list(pool.map(_batch_task, *zip(*tasks)))
+
+        if merge:
+            for idx, path in enumerate(output_paths(filters, output_dir)):
+                with open_output(path, compression, binary=True) as outfile:
+                    for (_, _, part_paths, _), summary in zip(tasks, summaries):
+                        if summary["error"] is None:
+                            with part_paths[idx].open("rb") as part:
+                                shutil.copyfileobj(part, outfile)
     finally:
-        for f in output_files:
-            f.close()
+        if merge:
+            shutil.rmtree(output_dir / ".parts", ignore_errors=True)
+
+    return summaries
+
+
+def print_batch_summary(summaries: list[dict]) -> None:
+    width = max(len(s["file"]) for s in summaries)
+    for s in summaries:
+        result = f"failed: {s['error']}" if s["error"] else f"{s['lines']:>12,} lines {s['bytes']:>16,} bytes"
+        print(f"{s['file']:<{width}}  {result}")
+
+    done = [s for s in summaries if s["error"] is None]
+    print(
+        f"{len(done)} of {len(summaries)} files, "
+        f"{sum(s['lines'] for s in done):,} lines, {sum(s['bytes'] for s in done):,} bytes"
+    )
 
 
 def main_cli() -> None:
@@ -64,7 +642,55 @@ def main_cli() -> None:
 
     print("Input file:", args.input_file)
     print("Output dir:", args.output_dir)
+    if args.jobs > 1:
+        print("Jobs:", args.jobs)
 
     filters = load_filters()
 
-    filter_logs(filters, args.input_file, args.output_dir)
+    if args.batch:
+        summaries = filter_batch(
+            filters, args.input_file, args.output_dir, jobs=args.jobs, merge=args.merge, compression=args.compress
+        )
+        print_batch_summary(summaries)
+        if any(s["error"] for s in summaries):
+            raise SystemExit(1)
+        return
+
+    if args.follow:
+        follow_logs(filters, args.input_file, args.output_dir, interval=args.interval, compression=args.compress)
+        return
+
+    profiler = None
+    if args.profile is not None:
+        from src.profiling import FilterProfiler
+
+        profiler = FilterProfiler(filters)
+    timestamps = None
+    if args.since is not None or args.until is not None or args.histogram:
+        timestamps = TimestampParser.from_config(load_config())
+    stats = None
+    if args.stats is not None:
+        from src.stats import MatchStats
+
+        stats = MatchStats(filters, histogram=args.histogram, timestamps=timestamps)
+
+    filter_logs(
+        filters,
+        args.input_file,
+        args.output_dir,
+        jobs=args.jobs,
+        use_mmap=args.mmap,
+        use_index=args.index,
+        compression=args.compress,
+        profiler=profiler,
+        since=args.since,
+        until=args.until,
+        timestamps=timestamps,
+        bitmap=args.bitmap,
+        stats=stats,
+    )
+
+    if profiler is not None:
+        profiler.write_report(None if args.profile == "-" else Path(args.profile))
+    if stats is not None:
+        stats.write_report(None if args.stats == "-" else Path(args.stats))
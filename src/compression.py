@@ -0,0 +1,184 @@
+import io
+import queue
+import threading
+from pathlib import Path
+
+# Leading bytes of each supported format
+MAGIC = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+    "zstd": b"\x28\xb5\x2f\xfd",
+}
+
+# File name suffix written for each format
+SUFFIXES = {
+    "gzip": ".gz",
+    "bz2": ".bz2",
+    "xz": ".xz",
+    "zstd": ".zst",
+}
+
+# Bytes per chunk handed from the decompression thread to the reader
+CHUNK_SIZE = 1 << 20
+
+
+def detect_compression(path: Path) -> None | str:
+    """Return the compression format of the file from its magic bytes, or None for plain files."""
+    with path.open("rb") as f:
+        head = f.read(max(len(magic) for magic in MAGIC.values()))
+    for fmt, magic in MAGIC.items():
+        if head.startswith(magic):
+            return fmt
+    return None
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise RuntimeError("Reading or writing zstd files needs the 'zstandard' package (pip install zstandard).")
+    return zstandard
+
+
+def decompress_stream(raw, fmt: str):
+    """
+    Wrap an open binary file object of compressed data into a stream of the
+    decompressed bytes. Closing the stream does not close `raw`.
+    """
+    # Codec modules are imported on first use, so plain logs never load them
+    if fmt == "gzip":
+        import gzip
+
+        return gzip.GzipFile(fileobj=raw, mode="rb")
+    if fmt == "bz2":
+        import bz2
+
+        return bz2.BZ2File(raw, mode="rb")
+    if fmt == "xz":
+        import lzma
+
+        return lzma.LZMAFile(raw, mode="rb")
+    if fmt == "zstd":
+        return _zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=False)
+    raise ValueError(f"Unknown compression format: {fmt}")
+
+
+class ThreadedReader(io.RawIOBase):
+    def __init__(self, stream, source=None, chunk_size: int = CHUNK_SIZE, depth: int = 8) -> None:
+        """
+        Read a stream ahead on a background thread.
+
+        Decompressors release the GIL while they work, so decompressing the
+        next chunks overlaps with filtering the current one. At most `depth`
+        chunks are buffered. Wrap in `io.BufferedReader` to read lines.
+
+        `source` is the file the stream reads from, if any; it is closed
+        together with the reader, and its position shows the progress.
+        """
+        super().__init__()
+        self.source = source
+        self._stream = stream
+        self._chunks = queue.Queue(maxsize=depth)
+        self._current = memoryview(b"")
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._pump, args=(chunk_size,), daemon=True)
+        self._thread.start()
+
+    def _pump(self, chunk_size: int) -> None:
+        try:
+            while not self._stopped.is_set():
+                chunk = self._stream.read(chunk_size)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item) -> None:
+        # Give up once the reader is closed, instead of blocking on a full queue
+        while not self._stopped.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._current:
+            item = self._chunks.get()
+            if isinstance(item, Exception):
+                raise item
+            if not item:
+                # Keep reporting EOF on later calls
+                self._chunks.put(item)
+                return 0
+            self._current = memoryview(item)
+
+        size = min(len(buffer), len(self._current))
+        buffer[:size] = self._current[:size]
+        self._current = self._current[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stopped.set()
+            self._thread.join()
+            self._stream.close()
+            if self.source is not None:
+                self.source.close()
+        super().close()
+
+
+def open_log(path: Path):
+    """
+    Open a log file for binary reading, decompressing it on the fly when
+    its magic bytes show a supported compression format.
+
+    Compressed input is decompressed on a background thread (see
+    `ThreadedReader`, reachable as `.raw`) and cannot seek.
+    """
+    fmt = detect_compression(path)
+    if fmt is None:
+        return path.open("rb")
+
+    source = path.open("rb")
+    try:
+        stream = decompress_stream(source, fmt)
+    except Exception:
+        source.close()
+        raise
+    return io.BufferedReader(ThreadedReader(stream, source))
+
+
+def open_output(path: Path, compression: None | str, binary: bool = False):
+    """
+    Open an output file for writing, compressed with the given format.
+    The format's suffix (see `SUFFIXES`) is appended to the file name.
+    Text mode writes UTF-8.
+    """
+    if compression is None:
+        return path.open("wb") if binary else path.open("w", encoding="utf-8")
+
+    path = path.with_name(path.name + SUFFIXES[compression])
+    if compression == "gzip":
+        import gzip
+
+        stream = gzip.open(path, "wb")
+    elif compression == "bz2":
+        import bz2
+
+        stream = bz2.open(path, "wb")
+    elif compression == "xz":
+        import lzma
+
+        stream = lzma.open(path, "wb")
+    elif compression == "zstd":
+        stream = _zstandard().ZstdCompressor().stream_writer(path.open("wb"), closefd=True)
+    else:
+        raise ValueError(f"Unknown compression format: {compression}")
+
+    return stream if binary else io.TextIOWrapper(stream, encoding="utf-8")
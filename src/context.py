@@ -0,0 +1,94 @@
+from src.buffer import Buffer, ByteBuffer
+from src.filter import Filter
+
+# Most bytes of before-context lines waiting per filter when lines are tracked as text
+BEFORE_BYTES = 1 << 20
+
+
+class ContextTracker:
+    def __init__(self, filters: dict[str, Filter], max_bytes: None | int = None) -> None:
+        """
+        Add `before`/`after` context lines to the matches of each filter,
+        like `grep -B/-A`, in one streaming pass.
+
+        Feed every non-blank line, in order, with the indices of the filters
+        it matched (see `add`). Per filter, the last `before` lines wait in a
+        last-N `Buffer`; a match releases them together with the match and
+        the next `after` lines. Overlapping windows are merged, so no line is
+        reported twice for the same filter. Memory is bounded by the sum of
+        the `before` settings, and with `max_bytes` also by bytes.
+
+        Parameters
+        ----------
+        filters : dict[str, Filter]
+            Filters as returned by `load_filters`.
+        max_bytes : int or None
+            For `str` lines: keep the waiting lines UTF-8 encoded in a
+            `ByteBuffer` of this many bytes per filter, so a few huge lines
+            cannot exhaust memory; the oldest lines that do not fit are
+            dropped from the `before` context. None keeps any items as they are.
+        """
+        self._encode = max_bytes is not None
+        # [filter index, Buffer of waiting lines or None, after, after lines left]
+        self._contexts = [
+            [idx, self._new_buffer(flt.before, max_bytes) if flt.before else None, flt.after, 0]
+            for idx, flt in enumerate(filters.values())
+            if flt.before or flt.after
+        ]
+        self._plain = [not (flt.before or flt.after) for flt in filters.values()]
+
+    @classmethod
+    def for_filters(cls, filters: dict[str, Filter], max_bytes: None | int = None) -> "None | ContextTracker":
+        """A tracker if any filter asks for context lines, else None."""
+        if any(flt.before or flt.after for flt in filters.values()):
+            return cls(filters, max_bytes)
+        return None
+
+    @staticmethod
+    def _new_buffer(before: int, max_bytes: None | int):
+        if max_bytes is None:
+            return Buffer(before, save_first=False)
+        return ByteBuffer(before, save_first=False, max_bytes=max_bytes)
+
+    def reset(self) -> None:
+        """Forget waiting lines and open windows, e.g. when the input starts over."""
+        for context in self._contexts:
+            if context[1] is not None:
+                context[1].clear()
+            context[3] = 0
+
+    def add(self, item, matched: list[int]) -> list[tuple[int, object]]:
+        """
+        Feed the next line (or any item standing for it, e.g. its offset)
+        and the filters it matched; returns the (filter index, item) pairs
+        to output now, in order per filter.
+        """
+        plain = self._plain
+        out = [(idx, item) for idx in matched if plain[idx]]
+        hits = set(matched)
+        encoded = None
+
+        for context in self._contexts:
+            idx, buffer, after, left = context
+            if idx in hits:
+                if buffer is not None and len(buffer):
+                    if self._encode:
+                        out.extend((idx, str(waiting, "utf-8")) for waiting in buffer.get())
+                    else:
+                        out.extend((idx, waiting) for waiting in buffer.get())
+                    buffer.clear()
+                out.append((idx, item))
+                context[3] = after
+            elif left:
+                out.append((idx, item))
+                context[3] = left - 1
+            elif buffer is not None:
+                if self._encode:
+                    # Encoded once, for all filters waiting with this line
+                    if encoded is None:
+                        encoded = item.encode("utf-8")
+                    buffer.add(encoded)
+                else:
+                    buffer.add(item)
+
+        return out
@@ -0,0 +1,144 @@
+from src.filter import Filter
+
+# Expression nodes are nested tuples, so equal subexpressions compare and hash equal:
+#   ("sub", text), ("reg", pattern), ("and", (node, ...)), ("or", (node, ...)), ("not", node)
+
+
+def filter_expression(flt: Filter) -> tuple:
+    """Expression of a flat `Filter`: the AND (all_match) or OR of its keywords."""
+    if flt.expression is not None:
+        return flt.expression
+    leaves = tuple(("sub", sub) for sub in flt.substrings) + tuple(("reg", p) for p in flt.patterns)
+    return _combine("and" if flt.all_match else "or", leaves)
+
+
+def parse_expression(node, resolve) -> tuple:
+    """
+    Compile an expression from config.json into a node tuple.
+
+    `node` is a keyword ({"reg": bool, "keyword": str}), {"and": [...]},
+    {"or": [...]}, {"not": node} or {"filter": name}; `resolve(name)` returns
+    the expression of the named filter.
+    """
+    if not isinstance(node, dict):
+        raise ValueError(f"Expression nodes must be objects, got {node!r}.")
+    if "keyword" in node:
+        return ("reg", node["keyword"]) if node.get("reg", False) else ("sub", node["keyword"])
+    if "filter" in node:
+        return resolve(node["filter"])
+    if "not" in node:
+        child = parse_expression(node["not"], resolve)
+        # not not x == x
+        return child[1] if child[0] == "not" else ("not", child)
+    for op in ("and", "or"):
+        if op in node:
+            return _combine(op, tuple(parse_expression(child, resolve) for child in node[op]))
+    raise ValueError(f"Unknown expression node {node!r}.")
+
+
+def _combine(op: str, children: tuple) -> tuple:
+    """AND/OR node with nested nodes of the same kind flattened and duplicates removed."""
+    flat = []
+    for child in children:
+        flat.extend(child[1] if child[0] == op else (child,))
+    flat = tuple(dict.fromkeys(flat))
+    return flat[0] if len(flat) == 1 else (op, flat)
+
+
+def build_expression_filters(settings: list[dict], filters: dict) -> None:
+    """
+    Create an `ExpressionFilter` for every config entry with an "expression",
+    in place of its None entry in `filters`. References to other filters are
+    resolved by name; cycles raise ValueError.
+    """
+    entries = {s["name"]: s for s in settings if "expression" in s}
+    expressions = {}
+    resolving = []
+
+    def resolve(name):
+        if name not in filters:
+            raise ValueError(f"Expression refers to unknown filter {name!r}.")
+        if name not in entries:
+            return filter_expression(filters[name])
+        if name in resolving:
+            raise ValueError(f"Filter {name!r} refers to itself: {' -> '.join(resolving + [name])}.")
+        if name not in expressions:
+            resolving.append(name)
+            expressions[name] = parse_expression(entries[name]["expression"], resolve)
+            resolving.pop()
+        return expressions[name]
+
+    for name, entry in entries.items():
+        filters[name] = ExpressionFilter(resolve(name), entry.get("before", 0), entry.get("after", 0))
+
+
+def iter_leaves(expression: tuple):
+    """Yield the ("sub", text) and ("reg", pattern) leaves of an expression, depth first."""
+    op, arg = expression
+    if op in ("sub", "reg"):
+        yield expression
+    elif op == "not":
+        yield from iter_leaves(arg)
+    else:
+        for child in arg:
+            yield from iter_leaves(child)
+
+
+def value_without_hits(expression: tuple) -> bool:
+    """Value of the expression on a line that contains none of its keywords."""
+    op, arg = expression
+    if op in ("sub", "reg"):
+        return False
+    if op == "not":
+        return not value_without_hits(arg)
+    if op == "and":
+        return all(value_without_hits(child) for child in arg)
+    return any(value_without_hits(child) for child in arg)
+
+
+class ExpressionFilter(Filter):
+    def __init__(self, expression: tuple, before: int = 0, after: int = 0) -> None:
+        """
+        Filter defined by a nested AND/OR/NOT expression (see `parse_expression`).
+
+        It offers the attributes of a flat `Filter` for its keywords:
+        `substrings`, `regexes`, `patterns`, `literals` and `gates` list the
+        distinct leaves, and `all_match` is None. `Matcher` merges the
+        expressions of all filters into one DAG instead of calling `match`.
+
+        Parameters
+        ----------
+        expression : tuple
+            Compiled expression node.
+        before, after : int
+            Context lines around each match, as for `Filter`.
+        """
+        leaves = list(dict.fromkeys(iter_leaves(expression)))
+        settings = [{"reg": op == "reg", "keyword": keyword} for op, keyword in leaves]
+        super().__init__(settings, all_match=None, learn_lines=0, before=before, after=after)
+        self.expression = expression
+        self._searches = {p: (gate, search) for p, gate, search in zip(self.patterns, self.gates, self.regexes)}
+
+    @property
+    def ordered_patterns(self):
+        return list(self.patterns)
+
+    def plan(self, lines):
+        # The evaluation order is given by the expression
+        pass
+
+    def match(self, line):
+        return self._evaluate(self.expression, line)
+
+    def _evaluate(self, node, line):
+        op, arg = node
+        if op == "sub":
+            return arg in line
+        if op == "reg":
+            gate, search = self._searches[arg]
+            return gate in line and search(line) is not None
+        if op == "not":
+            return not self._evaluate(arg, line)
+        if op == "and":
+            return all(self._evaluate(child, line) for child in arg)
+        return any(self._evaluate(child, line) for child in arg)
@@ -1,34 +1,180 @@
 import re
 
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+
+# Lines `Filter.match` evaluates every keyword on before reordering its checks
+LEARN_LINES = 1000
+
 
 class Filter:
-    def __init__(self, settings, all_match):
+    # Nested boolean expression of the filter; None for flat keyword lists (see `ExpressionFilter`)
+    expression = None
+
+    def __init__(self, settings, all_match, learn_lines=LEARN_LINES, before=0, after=0):
         self._all_match = all_match
+        # Context lines reported around each match (see `ContextTracker`)
+        self.before = before
+        self.after = after
         self.substrings = []
         self.regexes = []
+        # Source patterns of `regexes`, in the same order
+        self.patterns = []
+        # Substrings every match of each regex contains (see `required_literals`)
+        self.literals = []
 
         for s in settings:
             if s["reg"]:
                 self.regexes.append(re.compile(s["keyword"]).search)
+                self.patterns.append(s["keyword"])
+                self.literals.append(required_literals(s["keyword"]))
             else:
                 self.substrings.append(s["keyword"])
 
+        # A cheap `in` check on the longest literal runs before each regex;
+        # "" is in every line, so regexes without literals always run
+        self.gates = [literals[0] if literals else "" for literals in self.literals]
+
+        # Substrings and (gate, regex) pairs in the order `match` checks them. Cheap
+        # substrings always go before regexes; within each group the order follows
+        # the hit rates once they are known (see `plan`).
+        self._checks = (list(self.substrings), list(zip(self.gates, self.regexes)))
+        self._reg_order = list(range(len(self.regexes)))
+
+        # Hit counts while learning online; checks are reordered after `learn_lines` lines
+        self._learn_left = learn_lines if len(self.substrings) > 1 or len(self.regexes) > 1 else 0
+        self._sub_counts = [0] * len(self.substrings)
+        self._reg_counts = [0] * len(self.regexes)
+
+    @property
+    def all_match(self):
+        return self._all_match
+
+    @property
+    def key(self) -> tuple:
+        """What the filter matches and reports; filters with equal keys give the same results."""
+        return (self.expression, tuple(self.substrings), tuple(self.patterns), self.all_match, self.before, self.after)
+
+    @property
+    def ordered_patterns(self):
+        """Regex patterns in the order `match` checks them."""
+        return [self.patterns[i] for i in self._reg_order]
+
+    def plan(self, lines):
+        """
+        Order the checks by their hit rates on sample lines and stop learning:
+        rarest keyword first for all-match filters, most common first for
+        any-match filters, so non-matching lines are rejected (or matching
+        lines accepted) after as few checks as possible.
+        """
+        sub_counts = [0] * len(self.substrings)
+        reg_counts = [0] * len(self.regexes)
+        for line in lines:
+            _add_hits(sub_counts, reg_counts, *self._hits(line))
+        self._reorder(sub_counts, reg_counts)
+
     def match(self, line):
+        if self._learn_left:
+            return self._match_learning(line)
+
+        substrings, regexes = self._checks
         if self._all_match:
             # all must match
-            for sub in self.substrings:
+            for sub in substrings:
                 if sub not in line:
                     return False
-            for reg in self.regexes:
-                if not reg(line):
+            for gate, reg in regexes:
+                if gate not in line or not reg(line):
                     return False
             return True
         else:
             # any must match
-            for sub in self.substrings:
+            for sub in substrings:
                 if sub in line:
                     return True
-            for reg in self.regexes:
-                if reg(line):
+            for gate, reg in regexes:
+                if gate in line and reg(line):
                     return True
             return False
+
+    def _match_learning(self, line):
+        """`match` that evaluates every keyword to count its hits."""
+        sub_hits, reg_hits = self._hits(line)
+        _add_hits(self._sub_counts, self._reg_counts, sub_hits, reg_hits)
+
+        self._learn_left -= 1
+        if not self._learn_left:
+            self._reorder(self._sub_counts, self._reg_counts)
+
+        if self._all_match:
+            return all(sub_hits) and all(reg_hits)
+        return any(sub_hits) or any(reg_hits)
+
+    def _hits(self, line):
+        return (
+            [sub in line for sub in self.substrings],
+            [gate in line and reg(line) is not None for gate, reg in zip(self.gates, self.regexes)],
+        )
+
+    def _reorder(self, sub_counts, reg_counts):
+        # sorted() is stable, also in reverse, so ties keep the config order
+        descending = not self._all_match
+        sub_order = sorted(range(len(sub_counts)), key=sub_counts.__getitem__, reverse=descending)
+        self._reg_order = sorted(range(len(reg_counts)), key=reg_counts.__getitem__, reverse=descending)
+        self._checks = (
+            [self.substrings[i] for i in sub_order],
+            [(self.gates[i], self.regexes[i]) for i in self._reg_order],
+        )
+        self._learn_left = 0
+
+
+def _add_hits(sub_counts, reg_counts, sub_hits, reg_hits):
+    for i, hit in enumerate(sub_hits):
+        sub_counts[i] += hit
+    for i, hit in enumerate(reg_hits):
+        reg_counts[i] += hit
+
+
+def required_literals(pattern):
+    """
+    Return the literal substrings that every match of the regex contains,
+    longest first. Empty if the pattern has none, ignores case or does
+    not compile.
+    """
+    try:
+        parsed = _sre_parse.parse(pattern)
+    except re.error:
+        return []
+    if parsed.state.flags & _sre_parse.SRE_FLAG_IGNORECASE:
+        return []
+
+    literals = []
+    _collect_literals(parsed, literals)
+    return sorted(dict.fromkeys(literals), key=len, reverse=True)
+
+
+def _collect_literals(items, literals):
+    """Add the runs of consecutive literal characters that `items` requires."""
+    run = []
+    for op, arg in items:
+        if op is _sre_parse.LITERAL:
+            run.append(chr(arg))
+            continue
+
+        if run:
+            literals.append("".join(run))
+            run = []
+        if op is _sre_parse.SUBPATTERN:
+            _, add_flags, _, sub = arg
+            if not add_flags & _sre_parse.SRE_FLAG_IGNORECASE:
+                _collect_literals(sub, literals)
+        elif op in (_sre_parse.MAX_REPEAT, _sre_parse.MIN_REPEAT, getattr(_sre_parse, "POSSESSIVE_REPEAT", None)):
+            low, _, sub = arg
+            if low >= 1:
+                _collect_literals(sub, literals)
+        # Branches, classes, anchors and the like require no particular literal
+
+    if run:
+        literals.append("".join(run))
@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+
+class FileFollower:
+    def __init__(self, path: Path, start: int = 0) -> None:
+        """
+        Follow a growing log file like `tail -F`.
+
+        Each `poll()` returns the complete lines appended since the previous
+        poll; a trailing line without "\\n" is held back until it is finished.
+        When the file is truncated or replaced (log rotation), the rest of the
+        old file is drained first and the next poll continues at the start of
+        the new file with `reopened` set.
+
+        Parameters
+        ----------
+        path : Path
+            File to follow; it does not have to exist yet.
+        start : int
+            Byte offset of the first line to report, usually the size of the
+            part already processed.
+        """
+        self._path = path
+        self._file = None
+        self._pos = start
+        self._switch = False
+        self.reopened = False
+
+    @property
+    def position(self) -> int:
+        """Byte offset after the last line reported."""
+        return self._pos
+
+    def poll(self):
+        """
+        Check for rotation, then return an iterator of (offset, line) pairs
+        for the new lines, decoded like `iter_offset_lines`.
+        """
+        self.reopened = False
+
+        if self._file is None or self._switch:
+            self._open()
+        else:
+            self._check_rotation()
+
+        if self._file is None:
+            return iter(())
+        return self._read_lines()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # ------------------------------------------------------------------
+
+    def _open(self) -> None:
+        try:
+            new_file = self._path.open("rb")
+        except FileNotFoundError:
+            # Rotated away and not recreated yet; try again at the next poll
+            return
+
+        if self._file is not None:
+            self._file.close()
+            self._pos = 0
+            self.reopened = True
+        self._file = new_file
+        self._switch = False
+
+    def _check_rotation(self) -> None:
+        try:
+            stat = self._path.stat()
+        except FileNotFoundError:
+            # Keep draining the old file until a new one appears
+            return
+
+        current = os.fstat(self._file.fileno())
+        if (stat.st_ino, stat.st_dev) != (current.st_ino, current.st_dev):
+            # Replaced: finish the old file now, switch at the next poll
+            self._switch = True
+        elif stat.st_size < self._pos:
+            # Truncated in place: start over
+            self._pos = 0
+            self.reopened = True
+
+    def _read_lines(self):
+        f = self._file
+        f.seek(self._pos)
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                # Unfinished line; read it again once it is complete
+                break
+            offset = self._pos
+            self._pos += len(raw)
+            if raw.endswith(b"\r\n"):
+                raw = raw[:-2] + b"\n"
+            yield offset, raw.decode("utf-8", errors="ignore")
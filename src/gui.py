@@ -1,11 +1,27 @@
+import os
+import queue
 import shutil
+import tempfile
 import tkinter as tk
+from datetime import datetime
 from pathlib import Path
-from tkinter import filedialog, scrolledtext, ttk
+from tkinter import filedialog, messagebox, ttk
 
 # Internal modules
-from src.buffer import Buffer
-from src.utils import load_config, load_filters, make_name_filename
+from src.compression import SUFFIXES, detect_compression
+from src.context import ContextTracker
+from src.follow import FileFollower
+from src.loader import FileLoader
+from src.matcher import Matcher
+from src.timerange import TimestampParser
+from src.utils import load_config, load_filters, make_name_filename, match_filters
+from src.view import VirtualTextView
+
+# Milliseconds between two polls of the loader queue
+POLL_INTERVAL = 50
+
+# Milliseconds between two checks for appended lines in follow mode
+FOLLOW_INTERVAL = 1000
 
 
 class MainGui:
@@ -22,15 +38,50 @@ class MainGui:
         style = ttk.Style(self._root)
         style.theme_use("clam")
 
+        # Status bar: load progress and cancel button
+        status = ttk.Frame(self._root)
+        status.pack(side="bottom", fill="x")
+        self._status = ttk.Label(status, text="")
+        self._status.pack(side="left", padx=4)
+        self._cancel_button = ttk.Button(status, text="Cancel", state="disabled", command=self._cancel_loading)
+        self._cancel_button.pack(side="right")
+        self._progress = ttk.Progressbar(status, mode="determinate", maximum=1.0)
+        self._progress.pack(side="right", fill="x", expand=True, padx=4)
+
+        # Time window: only load lines logged between these ISO times
+        window_bar = ttk.Frame(self._root)
+        window_bar.pack(side="top", fill="x")
+        self._since = tk.StringVar(value="")
+        self._until = tk.StringVar(value="")
+        ttk.Label(window_bar, text="Since").pack(side="left", padx=4)
+        ttk.Entry(window_bar, textvariable=self._since, width=24).pack(side="left")
+        ttk.Label(window_bar, text="Until").pack(side="left", padx=4)
+        ttk.Entry(window_bar, textvariable=self._until, width=24).pack(side="left")
+        ttk.Button(window_bar, text="Apply", command=lambda: self._display_file()).pack(side="left", padx=4)
+        self._window = (None, None)
+
         # Notebook holds one tab per filter (plus the original)
         self._notebook = ttk.Notebook(self._root)
         self._notebook.pack(fill="both", expand=True)
 
-        # Mapping: tab_name -> text widget
-        self._text_widgets = {}
+        # Mapping: tab_name -> view
+        self._views = {}
 
         self._config = None
         self._filename = None
+        self._loader = None
+        # Filters whose results the tabs show
+        self._filters = None
+
+        # Follow mode: keep appending lines written after the load
+        self._follow = tk.BooleanVar(value=False)
+        self._follower = None
+        self._follow_matcher = None
+        self._follow_context = None
+        self._loaded_until = None
+
+        # Decompressed copy of a compressed input, which the views read from
+        self._spool = None
 
         # Load config and create tabs accordingly
         self._reinit()
@@ -47,6 +98,15 @@ class MainGui:
             label="Reload File",
             command=lambda: self._reload_and_display(),
         )
+        file_menu.add_command(
+            label="Cancel Loading",
+            command=lambda: self._cancel_loading(),
+        )
+        file_menu.add_checkbutton(
+            label="Follow File",
+            variable=self._follow,
+            command=lambda: self._toggle_follow(),
+        )
         file_menu.add_command(
             label="Save",
             command=lambda: self._save_to(),
@@ -60,6 +120,12 @@ class MainGui:
         # Start the Tk event loop
         self._root.mainloop()
 
+        self._cancel_loading()
+        self._stop_following()
+        for view in self._views.values():
+            view.destroy()
+        self._discard_spool(self._spool)
+
     # ------------------------------------------------------------------
 
     def _reinit(self) -> None:
@@ -68,32 +134,28 @@ class MainGui:
         This allows dynamic changes to filters/config without restarting.
         """
         self._config = load_config()
+        self._cancel_loading()
+        self._stop_following()
 
         # Remove all existing tabs
         for tab_id in self._notebook.tabs():
             self._notebook.forget(tab_id)
-        self._text_widgets.clear()
+        for view in self._views.values():
+            view.destroy()
+        self._views.clear()
 
         # Create "original" tab if enabled
         if self._config.get("show_original", True):
-            frame = ttk.Frame(self._notebook)
-            self._notebook.add(frame, text="original")
-
-            text_area = scrolledtext.ScrolledText(frame, wrap=tk.WORD)
-            text_area.pack(fill="both", expand=True)
-
-            self._text_widgets["original"] = text_area
+            view = VirtualTextView(self._notebook)
+            self._notebook.add(view, text="original")
+            self._views["original"] = view
 
         # Create one tab per filter
         filters = load_filters(self._config)
         for flt_name in filters.keys():
-            frame = ttk.Frame(self._notebook)
-            self._notebook.add(frame, text=flt_name)
-
-            text_area = scrolledtext.ScrolledText(frame, wrap=tk.WORD)
-            text_area.pack(fill="both", expand=True)
-
-            self._text_widgets[flt_name] = text_area
+            view = VirtualTextView(self._notebook)
+            self._notebook.add(view, text=flt_name)
+            self._views[flt_name] = view
 
     # ------------------------------------------------------------------
 
@@ -107,6 +169,7 @@ class MainGui:
             filetypes=[
                 ("Log files", "*.log"),
                 ("Text files", "*.txt"),
+                ("Compressed logs", " ".join(f"*{suffix}" for suffix in SUFFIXES.values())),
                 ("All files", "*.*"),
             ],
         )
@@ -124,63 +187,229 @@ class MainGui:
 
     def _display_file(self) -> None:
         """
-        Read the selected file, apply filters, and populate all tabs.
-        Uses Buffer to efficiently store first/last N lines.
+        Start reading the selected file in a background thread.
+        Tabs receive the offsets of their lines in batches of `max_line`
+        input lines while the window stays responsive.
         """
         if not self._filename:
             return
 
-        # Unlock and clear widgets
-        for widget in self._text_widgets.values():
-            widget.config(state="normal")
-            widget.delete("1.0", tk.END)
+        try:
+            self._window = self._read_window()
+        except ValueError as e:
+            messagebox.showerror("log filter", f"Invalid time, use ISO format like 2026-01-01T10:00: {e}")
+            return
 
-        buffers = {
-            name: Buffer(
-                capacity=self._config["max_line"],
-                save_first=self._config["show_first_max_line"],
-            )
-            for name in self._text_widgets.keys()
-        }
+        self._cancel_loading()
+        self._stop_following()
+        self._loaded_until = None
+
+        # Compressed files are decompressed while loading into a spool file,
+        # since the views need random access to the lines
+        old_spool = self._spool
+        self._spool = None
+        source = self._filename
+        if detect_compression(self._filename) is not None:
+            fd, spool = tempfile.mkstemp(prefix="log_filter_", suffix=".txt")
+            os.close(fd)
+            self._spool = source = Path(spool)
+
+        for view in self._views.values():
+            view.set_source(source)
+        self._discard_spool(old_spool)
+
+        self._filters = load_filters(self._config)
+        self._start_loader(
+            self._filename,
+            self._filters,
+            keep_original="original" in self._views,
+            spool=self._spool,
+        )
 
-        filters = load_filters(self._config)
+    def _read_window(self) -> tuple:
+        """(since, until) from the time window entries; raises ValueError for invalid times."""
+        return tuple(
+            datetime.fromisoformat(var.get().strip()) if var.get().strip() else None
+            for var in (self._since, self._until)
+        )
+
+    def _start_loader(
+        self, path: Path, filters: dict, keep_original: bool, spool: None | Path = None, end: None | int = None
+    ) -> None:
+        """Load the filters' lines of the file into their tabs in the background."""
+        self._loader = FileLoader(
+            path,
+            filters,
+            keep_original=keep_original,
+            # Not for a spool read directly, which would get an index next to it
+            use_index=self._config["use_index"] and path == self._filename,
+            batch_lines=self._config["max_line"],
+            spool=spool,
+            profile=self._config["profile"],
+            since=self._window[0],
+            until=self._window[1],
+            timestamps=TimestampParser.from_config(self._config),
+            end=end,
+            # Stop at the last complete line, where following continues
+            follow=self._follow.get(),
+        )
+        self._loader.start()
 
-        with self._filename.open("r", encoding="utf-8", errors="ignore") as f:
-            count_lines = 0
-            capacity = self._config["max_line"]
+        self._progress["value"] = 0.0
+        self._status.config(text="Loading...")
+        self._cancel_button.config(state="normal")
+        self._root.after(POLL_INTERVAL, self._poll_loader, self._loader)
 
-            for line in f:
-                if line.isspace():
-                    continue
+    def _poll_loader(self, loader: FileLoader) -> None:
+        """Move finished batches from the loader into the views; reschedules itself until the loader ends."""
+        if loader is not self._loader:
+            # Superseded by a newer load
+            return
 
-                stripped = line.rstrip("\n")
+        # All batches waiting in the queue go into each view at once, so a
+        # view redraws at most once per poll
+        pending = {}
+        try:
+            while True:
+                kind, payload = loader.messages.get_nowait()
+
+                if kind == "batch":
+                    bytes_done, bytes_total, batches = payload
+                    for name, offsets in batches.items():
+                        if offsets and name in self._views:
+                            if name in pending:
+                                pending[name].extend(offsets)
+                            else:
+                                pending[name] = offsets
+                    self._progress["value"] = bytes_done / bytes_total if bytes_total else 1.0
+                    continue
 
-                # Always store original
-                if "original" in buffers:
-                    buffers["original"].add(stripped)
+                self._add_offsets(pending)
+                self._loader = None
+                self._cancel_button.config(state="disabled")
+                if loader.profiler is not None and kind != "error":
+                    self._show_profile(loader.profiler.report())
+                if kind == "done":
+                    self._status.config(text=f"Loaded {self._filename.name}")
+                    self._loaded_until = payload
+                    if self._follow.get():
+                        self._start_following()
+                elif kind == "cancelled":
+                    self._status.config(text="Loading cancelled")
+                else:
+                    self._status.config(text="Loading failed")
+                    messagebox.showerror("log filter", f"Could not load {self._filename}: {payload}")
+                return
+        except queue.Empty:
+            pass
+
+        self._add_offsets(pending)
+        self._root.after(POLL_INTERVAL, self._poll_loader, loader)
+
+    def _show_profile(self, report: str) -> None:
+        """Show the filter profile of a load in its own window; the GUI may have no console."""
+        window = tk.Toplevel(self._root)
+        window.title(f"Filter profile: {self._filename.name}")
+        text = tk.Text(window, wrap="none", font="TkFixedFont")
+        scrollbar = ttk.Scrollbar(window, orient="vertical", command=text.yview)
+        text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        text.pack(fill="both", expand=True)
+        text.insert("1.0", report)
+        text.configure(state="disabled")
+
+    def _add_offsets(self, batches: dict) -> None:
+        """Append offset batches {tab_name: offsets} to the views."""
+        for name, offsets in batches.items():
+            self._views[name].add_offsets(offsets)
+
+    @staticmethod
+    def _discard_spool(spool: None | Path) -> None:
+        """Delete a spool file once no view reads from it anymore."""
+        if spool is None:
+            return
+        try:
+            spool.unlink()
+        except OSError:
+            pass
+
+    def _cancel_loading(self) -> None:
+        """Stop the running load, if any; lines loaded so far stay visible."""
+        if self._loader is None:
+            return
 
-                # Apply filters
-                for tab_name, flt in filters.items():
-                    if flt.match(stripped):
-                        buffers[tab_name].add(stripped)
+        self._loader.cancel()
+        self._loader = None
+        self._cancel_button.config(state="disabled")
+        self._status.config(text="Loading cancelled")
 
-                count_lines += 1
+    # ------------------------------------------------------------------
 
-                # Flush small chunks to GUI
-                if count_lines % capacity == 0:
-                    for name, widget in self._text_widgets.items():
-                        for buffered_line in buffers[name].get():
-                            widget.insert(tk.END, buffered_line + "\n")
-                        buffers[name].clear()
+    def _toggle_follow(self) -> None:
+        """Start or stop following; a running load starts following once it is done."""
+        if not self._follow.get():
+            self._stop_following()
+        elif self._loader is None and self._loaded_until is not None:
+            self._start_following()
+
+    def _start_following(self) -> None:
+        """Watch the loaded file for lines appended after the loaded part."""
+        if self._spool is not None:
+            self._status.config(text="Compressed files cannot be followed")
+            return
+        if self._window[1] is not None:
+            self._status.config(text="Files cannot be followed while an Until time is set")
+            return
 
-                    self._root.update_idletasks()
+        self._stop_following()
+        self._follower = FileFollower(self._filename, start=self._loaded_until)
+        filters = load_filters(self._config)
+        self._follow_matcher = Matcher.cached(filters)
+        self._follow_context = ContextTracker.for_filters(filters)
+        self._status.config(text=f"Following {self._filename.name}")
+        self._root.after(FOLLOW_INTERVAL, self._follow_tick, self._follower)
+
+    def _stop_following(self) -> None:
+        if self._follower is not None:
+            self._follower.close()
+            self._follower = None
+
+    def _follow_tick(self, follower: FileFollower) -> None:
+        """Filter the lines appended since the last tick into the tabs; reschedules itself."""
+        if follower is not self._follower:
+            # Stopped or superseded
+            return
 
-        # Final flush
-        for name, widget in self._text_widgets.items():
-            for buffered_line in buffers[name].get():
-                widget.insert(tk.END, buffered_line + "\n")
-            buffers[name].clear()
-            widget.config(state="disabled")
+        lines = follower.poll()
+        if follower.reopened:
+            # Offsets now refer to the new file; start the tabs over
+            for view in self._views.values():
+                view.set_source(self._filename)
+            if self._follow_context is not None:
+                self._follow_context.reset()
+
+        batches = {name: [] for name in self._views.keys()}
+        original = batches.get("original")
+        tab_batches = [batches[name] for name in self._follow_matcher.names]
+
+        for offset, line in lines:
+            if line.isspace():
+                continue
+
+            stripped = line.rstrip("\n")
+            if original is not None:
+                original.append(offset)
+            matched = self._follow_matcher.match(stripped)
+            if self._follow_context is not None:
+                for idx, line_offset in self._follow_context.add(offset, matched):
+                    tab_batches[idx].append(line_offset)
+            else:
+                for idx in matched:
+                    tab_batches[idx].append(offset)
+
+        self._add_offsets({name: offsets for name, offsets in batches.items() if offsets})
+
+        self._root.after(FOLLOW_INTERVAL, self._follow_tick, follower)
 
     # ------------------------------------------------------------------
 
@@ -195,9 +424,72 @@ class MainGui:
         """
         Reload configuration (which rebuilds tabs),
         then re-display the currently loaded file.
+        If only filters changed, only those are evaluated (see `_refilter`).
         """
-        self._reinit()
-        self._display_file()
+        if not self._refilter():
+            self._reinit()
+            self._display_file()
+
+    def _refilter(self) -> bool:
+        """
+        Update the tabs of a finished load to the current filter config:
+        tabs of unchanged (or only renamed) filters keep their lines, tabs of
+        removed filters are dropped, and only new or changed filters are run,
+        up to where the other tabs stopped. Returns False if this is not
+        possible and everything must be reloaded: while loading, or if the
+        main config or the time window changed.
+        """
+        if self._filename is None or self._loader is not None or self._loaded_until is None:
+            return False
+        try:
+            if load_config() != self._config or self._read_window() != self._window:
+                return False
+        except ValueError:
+            return False
+
+        filters = load_filters(self._config)
+        reuse = match_filters(self._filters, filters)
+        source = self._filename if self._spool is None else self._spool
+        if self._spool is not None:
+            end = self._spool.stat().st_size
+        elif self._follower is not None:
+            end = self._follower.position
+        else:
+            end = self._loaded_until
+        self._stop_following()
+
+        old_views = self._views
+        self._views = {}
+        if "original" in old_views:
+            self._views["original"] = old_views.pop("original")
+        for name, old_name in reuse.items():
+            if old_name is None:
+                view = VirtualTextView(self._notebook)
+                view.set_source(source)
+            else:
+                view = old_views.pop(old_name)
+            self._views[name] = view
+        for view in old_views.values():
+            self._notebook.forget(view)
+            view.destroy()
+        # Moving every tab to the end in turn puts them in config order
+        for name, view in self._views.items():
+            self._notebook.insert("end", view, text=name)
+
+        self._filters = filters
+        changed = {name: filters[name] for name, old_name in reuse.items() if old_name is None}
+        if not changed:
+            self._loaded_until = end
+            self._status.config(text=f"Filters of {self._filename.name} are up to date")
+            if self._follow.get():
+                self._start_following()
+            return True
+
+        # Set again once the new tabs are complete
+        self._loaded_until = None
+        # A spool is a plain file, so it is read directly
+        self._start_loader(source, changed, keep_original=False, end=end)
+        return True
 
     # ------------------------------------------------------------------
 
@@ -222,10 +514,12 @@ class MainGui:
                 shutil.rmtree(item)
 
         # Save each tab's content
-        for name, widget in self._text_widgets.items():
-            content = widget.get("1.0", "end-1c")
+        for name, view in self._views.items():
             out_path = path / f"{make_name_filename(name)}.txt"
-            out_path.write_text(content, encoding="utf-8")
+            with out_path.open("w", encoding="utf-8") as out:
+                for line in view.iter_lines():
+                    out.write(line)
+                    out.write("\n")
 
 
 def main_gui() -> None:
@@ -0,0 +1,242 @@
+import json
+import re
+import zlib
+from pathlib import Path
+
+from src.filter import Filter, required_literals
+
+INDEX_VERSION = 2
+
+# Bytes per index block; blocks always end at a line boundary
+BLOCK_SIZE = 1 << 20
+
+# Bits of each block's trigram bitset; a power of two
+BLOCK_BITS = 1 << 16
+
+# Non-overlapping trigrams; three searches starting at offsets 0, 1 and 2 find all of them
+_TRIGRAM = re.compile(rb"...", re.DOTALL)
+
+
+class LogIndex:
+    def __init__(self, size: int, mtime_ns: int, blocks: list[int], line_counts: list[int], bitsets: bytes):
+        """
+        Sidecar index of a log file, used to skip blocks that cannot match.
+
+        The file is cut into blocks of about `BLOCK_SIZE` bytes at line
+        boundaries. For each block the index keeps its start offset, its line
+        count and a bitset of `BLOCK_BITS` bits with one bit set per hashed
+        trigram (3 bytes) of its whitespace-separated words. A keyword occurs
+        only in blocks holding every trigram of its words, so the blocks
+        selected are a superset of the matching ones, and the index size only
+        depends on the file size, not on how many distinct words it holds.
+
+        Parameters
+        ----------
+        size, mtime_ns : int
+            Size and modification time of the indexed file; the index is
+            rebuilt once either changes.
+        blocks : list[int]
+            Start offset of each block.
+        line_counts : list[int]
+            Number of lines in each block.
+        bitsets : bytes
+            The trigram bitsets of all blocks, `BLOCK_BITS // 8` bytes each.
+        """
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.blocks = blocks
+        self.line_counts = line_counts
+        self.bitsets = bitsets
+        self._all = (1 << len(blocks)) - 1
+
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def sidecar_path(log_path: Path) -> Path:
+        return log_path.with_name(log_path.name + ".lfidx")
+
+    @classmethod
+    def build(cls, log_path: Path) -> "LogIndex":
+        """Scan the whole file once and build its index."""
+        stat = log_path.stat()
+        blocks = []
+        line_counts = []
+        bitsets = bytearray()
+
+        with log_path.open("rb") as f:
+            pos = 0
+            while True:
+                chunk = f.read(BLOCK_SIZE)
+                if not chunk:
+                    break
+                # Extend the block to the end of its last line
+                if not chunk.endswith(b"\n"):
+                    chunk += f.readline()
+
+                bits = bytearray(BLOCK_BITS // 8)
+                for bucket in _buckets(chunk):
+                    bits[bucket >> 3] |= 1 << (bucket & 7)
+                bitsets += bits
+
+                blocks.append(pos)
+                line_counts.append(chunk.count(b"\n") + (0 if chunk.endswith(b"\n") else 1))
+                pos += len(chunk)
+
+        return cls(stat.st_size, stat.st_mtime_ns, blocks, line_counts, bytes(bitsets))
+
+    @classmethod
+    def load(cls, log_path: Path) -> "None | LogIndex":
+        """Load the sidecar index; None if it is missing, unreadable or stale."""
+        index_path = cls.sidecar_path(log_path)
+        try:
+            data = index_path.read_bytes()
+            # One line of JSON metadata, then the raw bitsets
+            end = data.index(b"\n")
+            header = json.loads(data[:end])
+        except (OSError, ValueError):
+            return None
+
+        stat = log_path.stat()
+        if (
+            not isinstance(header, dict)
+            or header.get("version") != INDEX_VERSION
+            or header.get("block_bits") != BLOCK_BITS
+            or header["size"] != stat.st_size
+            or header["mtime_ns"] != stat.st_mtime_ns
+        ):
+            return None
+
+        bitsets = data[end + 1 :]
+        if len(bitsets) != len(header["blocks"]) * (BLOCK_BITS // 8):
+            return None
+        return cls(header["size"], header["mtime_ns"], header["blocks"], header["line_counts"], bitsets)
+
+    def save(self, log_path: Path) -> None:
+        header = {
+            "version": INDEX_VERSION,
+            "block_bits": BLOCK_BITS,
+            "size": self.size,
+            "mtime_ns": self.mtime_ns,
+            "blocks": self.blocks,
+            "line_counts": self.line_counts,
+        }
+        with self.sidecar_path(log_path).open("wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(self.bitsets)
+
+    @classmethod
+    def open(cls, log_path: Path) -> "LogIndex":
+        """
+        Return the index of the file, building and saving it on first use.
+        A read-only location only prevents saving, not indexing.
+        """
+        index = cls.load(log_path)
+        if index is None:
+            print(f"Building index for {log_path}")
+            index = cls.build(log_path)
+            try:
+                index.save(log_path)
+            except OSError as e:
+                print(f"Could not save index next to {log_path}: {e}")
+        return index
+
+    # ------------------------------------------------------------------
+
+    def keyword_mask(self, keyword: str) -> int:
+        """Bitmask of the blocks that may contain the substring."""
+        # (byte, bit) of each trigram bucket within a block's bitset
+        probes = [(bucket >> 3, 1 << (bucket & 7)) for bucket in _buckets(keyword.encode("utf-8"))]
+        if not probes:
+            # Words shorter than a trigram could be anywhere
+            return self._all
+
+        bitsets = self.bitsets
+        row = BLOCK_BITS // 8
+        mask = 0
+        for i in range(len(self.blocks)):
+            base = i * row
+            for byte, bit in probes:
+                if not bitsets[base + byte] & bit:
+                    break
+            else:
+                mask |= 1 << i
+        return mask
+
+    def filter_mask(self, flt: Filter) -> int:
+        """Bitmask of the blocks that may contain lines matched by the filter."""
+        if flt.expression is not None:
+            return self.expression_mask(flt.expression)
+
+        if flt.all_match:
+            mask = self._all
+            for sub in flt.substrings + [lit for literals in flt.literals for lit in literals]:
+                mask &= self.keyword_mask(sub)
+            return mask
+
+        if not all(flt.literals):
+            # A regex without required literals could match anywhere
+            return self._all
+        mask = 0
+        for sub in flt.substrings:
+            mask |= self.keyword_mask(sub)
+        for literals in flt.literals:
+            literal_mask = self._all
+            for lit in literals:
+                literal_mask &= self.keyword_mask(lit)
+            mask |= literal_mask
+        return mask
+
+    def expression_mask(self, expression: tuple) -> int:
+        """Bitmask of the blocks that may contain lines matched by an `ExpressionFilter` expression."""
+        op, arg = expression
+        if op == "sub":
+            return self.keyword_mask(arg)
+        if op == "reg":
+            mask = self._all
+            for lit in required_literals(arg):
+                mask &= self.keyword_mask(lit)
+            return mask
+        if op == "not":
+            # A block can hold lines without the keywords, whatever it contains
+            return self._all
+        if op == "and":
+            mask = self._all
+            for child in arg:
+                mask &= self.expression_mask(child)
+            return mask
+        mask = 0
+        for child in arg:
+            mask |= self.expression_mask(child)
+        return mask
+
+    def candidate_ranges(self, filters: dict[str, Filter]) -> list[tuple[int, int]]:
+        """
+        Byte ranges [start, end) that may contain lines matched by any filter.
+        Adjacent blocks are merged; all ranges start at a line boundary.
+        """
+        mask = 0
+        for flt in filters.values():
+            mask |= self.filter_mask(flt)
+            if mask == self._all:
+                break
+
+        ranges = []
+        ends = self.blocks[1:] + [self.size]
+        for i, (start, end) in enumerate(zip(self.blocks, ends)):
+            if not (mask >> i) & 1:
+                continue
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+
+def _buckets(data: bytes) -> set[int]:
+    """Bitset positions of the trigrams in the whitespace-separated words of `data`."""
+    # Each distinct word once; the trigrams spanning the joining spaces are dropped
+    words = b" ".join(set(data.split()))
+    trigrams = set()
+    for start in range(3):
+        trigrams.update(_TRIGRAM.findall(words, start))
+    return {zlib.crc32(trigram) & (BLOCK_BITS - 1) for trigram in trigrams if b" " not in trigram}
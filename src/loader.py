@@ -0,0 +1,203 @@
+import queue
+import threading
+from array import array
+from datetime import datetime
+from pathlib import Path
+
+from src.compression import open_log
+from src.context import ContextTracker
+from src.filter import Filter
+from src.index import LogIndex
+from src.matcher import Matcher
+from src.profiling import FilterProfiler
+from src.scan import iter_offset_lines, line_start
+from src.timerange import TimestampParser, clip_ranges, iter_time_window, time_window
+
+
+class FileLoader(threading.Thread):
+    def __init__(
+        self,
+        path: Path,
+        filters: dict[str, Filter],
+        keep_original: bool,
+        use_index: bool,
+        batch_lines: int,
+        spool: None | Path = None,
+        profile: bool = False,
+        since: None | datetime = None,
+        until: None | datetime = None,
+        timestamps: None | TimestampParser = None,
+        end: None | int = None,
+        follow: bool = False,
+    ) -> None:
+        """
+        Background thread that reads a file, applies the filters and reports
+        the offsets of matched lines in batches through `messages`.
+
+        Messages are (kind, payload) tuples:
+        - ("batch", (bytes_done, bytes_total, {tab_name: array of offsets}))
+        - ("done", bytes_read), ("cancelled", None) or ("error", exception) once, at the end;
+          `bytes_read` is the end of the last line read, e.g. to follow the file from there.
+
+        Parameters
+        ----------
+        path : Path
+            File to read.
+        filters : dict[str, Filter]
+            Filters as returned by `load_filters`.
+        keep_original : bool
+            Also report every non-blank line under the tab name "original".
+        use_index : bool
+            Only read the blocks selected by the sidecar index. Ignored
+            with `keep_original` or context lines, which need every line.
+        batch_lines : int
+            Number of input lines between two batches.
+        spool : Path or None
+            For compressed input: file to write the decompressed content to,
+            so the views can read lines from it. Offsets then refer to the
+            spool, and `use_index` is ignored.
+        profile : bool
+            Time every filter and keyword with a `FilterProfiler`, available
+            as `profiler` once the thread has ended. Loading gets slower.
+        since, until : datetime or None
+            Only load the lines logged in this time window, found by binary
+            search on the line timestamps (read in order for compressed input).
+        timestamps : TimestampParser or None
+            Reads the line timestamps; default: ISO 8601 at the line start.
+        end : int or None
+            Stop reading at this byte offset instead of the current end of
+            the file, e.g. to load more tabs up to where earlier ones
+            stopped. Ignored for compressed input.
+        follow : bool
+            The file is followed from `bytes_read` afterwards: a trailing line
+            without "\\n" is not reported yet, so `bytes_read` is always the
+            start of a line and the follower reports that line once complete.
+        """
+        super().__init__(daemon=True)
+        self.messages = queue.Queue()
+        self._path = path
+        self._filters = filters
+        self._keep_original = keep_original
+        self._use_index = use_index and not keep_original and ContextTracker.for_filters(filters) is None
+        self._spool = spool
+        self._batch_lines = batch_lines
+        self._cancel = threading.Event()
+        self.profiler = FilterProfiler(filters) if profile else None
+        self._since = since
+        self._until = until
+        self._timestamps = timestamps if timestamps is not None else TimestampParser()
+        self._end = end
+        self._follow = follow
+
+    def cancel(self) -> None:
+        """Ask the thread to stop at the next batch; it then reports ("cancelled", None)."""
+        self._cancel.set()
+
+    def run(self) -> None:
+        try:
+            bytes_read = self._scan()
+        except Exception as e:
+            self.messages.put(("error", e))
+            return
+        self.messages.put(("cancelled", None) if bytes_read is None else ("done", bytes_read))
+
+    # ------------------------------------------------------------------
+
+    def _scan(self) -> None | int:
+        matcher = Matcher.cached(self._filters) if self.profiler is None else self.profiler
+        context = ContextTracker.for_filters(self._filters)
+        size = self._path.stat().st_size
+        if self._end is not None and self._spool is None:
+            size = min(size, self._end)
+
+        names = (["original"] if self._keep_original else []) + matcher.names
+        batches = {name: array("Q") for name in names}
+        original = batches.get("original")
+        tab_batches = [batches[name] for name in matcher.names]
+
+        if self._spool is None:
+            ranges = [(0, size)]
+            if self._use_index:
+                ranges = clip_ranges(LogIndex.open(self._path).candidate_ranges(self._filters), 0, size)
+            if self._since is not None or self._until is not None:
+                ranges = clip_ranges(ranges, *time_window(self._path, self._timestamps, self._since, self._until))
+            f = self._path.open("rb")
+            spool = None
+        else:
+            # Decompress into the spool file; offsets then refer to the spool
+            ranges = [(0, None)]
+            f = open_log(self._path)
+            spool = self._spool.open("wb")
+        total = size if spool is not None else sum(end - start for start, end in ranges)
+
+        done_before = 0
+        count_lines = 0
+        # Offset of the last line read, and where a held back unfinished line starts
+        last_offset = None
+        held = None
+        try:
+            for start, end in ranges:
+                lines = iter_offset_lines(f, start, end, copy_to=spool)
+                if spool is not None and (self._since is not None or self._until is not None):
+                    lines = iter_time_window(lines, self._timestamps, self._since, self._until)
+                for offset, line in lines:
+                    last_offset = offset
+                    if self._follow and spool is None and not line.endswith("\n"):
+                        # Still being written; the follower reports it once complete
+                        held = offset
+                        break
+                    if line.isspace():
+                        continue
+
+                    stripped = line.rstrip("\n")
+
+                    if original is not None:
+                        original.append(offset)
+
+                    # Apply all filters in one scan
+                    if context is None:
+                        for idx in matcher.match(stripped):
+                            tab_batches[idx].append(offset)
+                    else:
+                        for idx, line_offset in context.add(offset, matcher.match(stripped)):
+                            tab_batches[idx].append(line_offset)
+
+                    count_lines += 1
+                    if count_lines % self._batch_lines == 0:
+                        if self._cancel.is_set():
+                            return None
+                        if spool is not None:
+                            # Views read the reported lines from the spool
+                            spool.flush()
+                            bytes_done = f.raw.source.tell()
+                        else:
+                            bytes_done = done_before + offset - start
+                        self._send(bytes_done, total, batches)
+                        batches = {name: array("Q") for name in names}
+                        original = batches.get("original")
+                        tab_batches = [batches[name] for name in matcher.names]
+
+                if end is not None:
+                    done_before += end - start
+
+            bytes_read = size
+            if spool is None:
+                if held is not None:
+                    bytes_read = held
+                elif last_offset is not None and ranges[-1][1] >= size:
+                    # The last line may run past `size` if the file grew meanwhile
+                    f.seek(last_offset)
+                    bytes_read = last_offset + len(f.readline())
+                elif self._follow:
+                    # Lines after the ranges read were skipped; never stop inside one
+                    bytes_read = line_start(f, size)
+        finally:
+            f.close()
+            if spool is not None:
+                spool.close()
+
+        self._send(total, total, batches)
+        return bytes_read
+
+    def _send(self, bytes_done: int, bytes_total: int, batches: dict[str, array]) -> None:
+        self.messages.put(("batch", (bytes_done, bytes_total, batches)))
@@ -0,0 +1,333 @@
+import re
+import threading
+
+from src.expression import iter_leaves, value_without_hits
+from src.filter import LEARN_LINES, Filter
+
+# Backreferences and conditional groups change meaning once patterns are
+# merged into one alternation, because group numbers shift.
+_GROUP_REFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+# Lookarounds and anchors see the neighbouring lines (or a stray "\r") when
+# a pattern runs over a whole buffer instead of a single stripped line.
+_LINE_CONTEXT = re.compile(r"\(\?[=!<]|\\[AZ]|\$")
+
+# Substring hits of lines without any
+_NO_HITS = frozenset()
+
+
+class Matcher:
+    # Matchers built by `cached`, oldest first
+    _cache = {}
+    _cache_lock = threading.Lock()
+    CACHE_SIZE = 8
+    # Lines `match` counts regex hits on before reordering the regexes of each filter
+    LEARN_LINES = LEARN_LINES
+
+    def __init__(self, filters: dict[str, Filter], binary: bool = False):
+        """
+        Compile a whole filter set into one matcher.
+
+        Every distinct keyword is tested at most once per line, no matter how
+        many filters share it: all substrings are checked once into a shared
+        hit set, regexes are run lazily and only once per line, and each
+        filter's all/any logic is evaluated from those shared results. A regex
+        only runs on lines containing its longest required literal
+        (`Filter.gates`).
+
+        Over the first `LEARN_LINES` lines, the hits of every regex of a
+        filter with several regexes are counted; then each filter checks its
+        regexes rarest first (all-match) or most common first (any-match),
+        like `Filter.plan`. Until then, the filter's own order is used.
+
+        Expression filters (`ExpressionFilter`) are merged into one DAG:
+        equal subexpressions of all filters become one node, evaluated at
+        most once per line, and their keywords share the hits above.
+
+        Per line, plain `in` checks beat a combined alternation in CPython's
+        re engine, so alternations are only used for `scan_gate`, which
+        searches whole buffers and saves the per-line work altogether.
+
+        Parameters
+        ----------
+        filters : dict[str, Filter]
+            Filters as returned by `load_filters`, in output order.
+        binary : bool
+            If True, match UTF-8 encoded `bytes` lines instead of `str`.
+            Regexes are recompiled as bytes patterns, so classes like \\w
+            and \\d only cover ASCII.
+        """
+        self.names = list(filters.keys())
+        self.binary = binary
+
+        substrings = {}
+        searches = {}
+        self._plans = []
+        # Expression DAG: node id -> (op, argument), and node -> id for sharing
+        self._nodes = []
+        self._node_ids = {}
+        for flt in filters.values():
+            if flt.expression is not None:
+                for op, keyword in iter_leaves(flt.expression):
+                    if op == "sub":
+                        substrings.setdefault(keyword.encode("utf-8") if binary else keyword, None)
+                    else:
+                        pattern = keyword.encode("utf-8") if binary else keyword
+                        if pattern not in searches:
+                            i = flt.patterns.index(keyword)
+                            if binary:
+                                searches[pattern] = (flt.gates[i].encode("utf-8"), re.compile(pattern).search)
+                            else:
+                                searches[pattern] = (flt.gates[i], flt.regexes[i])
+                # all_match None marks an expression; subs holds its root node id
+                self._plans.append((None, self._add_node(flt.expression, binary), ()))
+                continue
+
+            subs = [s.encode("utf-8") for s in flt.substrings] if binary else flt.substrings
+            patterns = [p.encode("utf-8") for p in flt.patterns] if binary else flt.patterns
+            for sub in subs:
+                substrings.setdefault(sub, None)
+            for pattern, gate, search in zip(patterns, flt.gates, flt.regexes):
+                if pattern not in searches:
+                    if binary:
+                        searches[pattern] = (gate.encode("utf-8"), re.compile(pattern).search)
+                    else:
+                        searches[pattern] = (gate, search)
+            # Regexes in the filter's check order, which `Filter.plan` may have tuned
+            ordered = [p.encode("utf-8") for p in flt.ordered_patterns] if binary else flt.ordered_patterns
+            self._plans.append((flt.all_match, frozenset(subs), tuple(dict.fromkeys(ordered))))
+
+        self._substrings = tuple(substrings)
+        self._searches = searches
+
+        # Longest first, so a shorter keyword never hides a longer one
+        sub_alternatives = [re.escape(s) for s in sorted(self._substrings, key=len, reverse=True)]
+        reg_alternatives = [b"(?:" + p + b")" if binary else f"(?:{p})" for p in searches]
+        bar = b"|" if binary else "|"
+
+        expressions = [(idx, flt.expression) for idx, flt in enumerate(filters.values()) if flt.expression is not None]
+
+        # Result for lines without any keyword: keyword-less all-match filters and
+        # expressions without regexes that hold when none of their keywords occurs
+        self._no_hit = sorted(
+            [idx for idx, (all_match, subs, regs) in enumerate(self._plans) if all_match and not subs and not regs]
+            + [
+                idx
+                for idx, expression in expressions
+                if value_without_hits(expression) and all(op == "sub" for op, _ in iter_leaves(expression))
+            ]
+        )
+
+        # Filters that can match a line without any substring hit; the only ones
+        # left to check on lines where no substring occurs
+        self._regex_only = [
+            (idx, all_match, regs)
+            for idx, (all_match, subs, regs) in enumerate(self._plans)
+            if regs and (not all_match or not subs)
+        ] + [
+            (idx, None, self._plans[idx][1])
+            for idx, expression in expressions
+            if any(op == "reg" for op, _ in iter_leaves(expression))
+        ]
+        self._regex_only.sort()
+
+        # Regex hits while learning, for the filters whose regex order can change
+        self._reg_counts = dict.fromkeys(
+            (
+                pattern
+                for all_match, _, regs in self._plans
+                if all_match is not None and len(regs) > 1
+                for pattern in regs
+            ),
+            0,
+        )
+        self._learn_left = self.LEARN_LINES if self._reg_counts else 0
+
+        # One multiline pattern over a whole buffer finds every line that may match
+        # (see `scan_gate`); None if some line could match without any keyword hit.
+        self.scan_gate = None
+        if (
+            not self._no_hit
+            and not any(value_without_hits(expression) for _, expression in expressions)
+            and (sub_alternatives or reg_alternatives)
+            and not any(_GROUP_REFERENCE.search(_as_str(p)) or _LINE_CONTEXT.search(_as_str(p)) for p in searches)
+        ):
+            try:
+                self.scan_gate = re.compile(bar.join(sub_alternatives + reg_alternatives), re.MULTILINE)
+            except re.error:
+                # e.g. inline global flags or duplicate group names
+                self.scan_gate = None
+
+    @classmethod
+    def cached(cls, filters: dict[str, Filter], binary: bool = False) -> "Matcher":
+        """
+        A matcher for the filters, reusing the last ones built for the same
+        `Filter` objects (as `load_filters` returns while the config is
+        unchanged) and the same regex check order.
+        """
+        key = (binary, tuple((name, flt, tuple(flt.ordered_patterns)) for name, flt in filters.items()))
+        with cls._cache_lock:
+            matcher = cls._cache.pop(key, None)
+            if matcher is None:
+                matcher = cls(filters, binary)
+                if len(cls._cache) >= cls.CACHE_SIZE:
+                    del cls._cache[next(iter(cls._cache))]
+            cls._cache[key] = matcher
+        return matcher
+
+    def match(self, line) -> list[int]:
+        """
+        Return the indices (in filter order) of all filters matching the line.
+        """
+        if self._learn_left > 0:
+            self._learn(line)
+
+        sub_hits = {sub for sub in self._substrings if sub in line}
+
+        searches = self._searches
+        if not sub_hits:
+            if not searches:
+                # A copy, since callers may change the result
+                return self._no_hit.copy()
+            return self._match_regex_only(line)
+
+        reg_hits = {}
+        matched = []
+
+        for idx, (all_match, subs, regs) in enumerate(self._plans):
+            if all_match:
+                # all must match
+                if not subs <= sub_hits:
+                    continue
+                for pattern in regs:
+                    hit = reg_hits.get(pattern)
+                    if hit is None:
+                        gate, search = searches[pattern]
+                        hit = reg_hits[pattern] = gate in line and search(line) is not None
+                    if not hit:
+                        break
+                else:
+                    matched.append(idx)
+            elif all_match is None:
+                # expression; node results share `reg_hits` under their int ids
+                if self._evaluate(subs, line, sub_hits, reg_hits):
+                    matched.append(idx)
+            else:
+                # any must match
+                if not subs.isdisjoint(sub_hits):
+                    matched.append(idx)
+                    continue
+                for pattern in regs:
+                    hit = reg_hits.get(pattern)
+                    if hit is None:
+                        gate, search = searches[pattern]
+                        hit = reg_hits[pattern] = gate in line and search(line) is not None
+                    if hit:
+                        matched.append(idx)
+                        break
+
+        return matched
+
+    def _match_regex_only(self, line) -> list[int]:
+        """`match` for lines without any substring hit."""
+        searches = self._searches
+        reg_hits = {}
+        matched = []
+
+        for idx, all_match, regs in self._regex_only:
+            if all_match is None:
+                if self._evaluate(regs, line, _NO_HITS, reg_hits):
+                    matched.append(idx)
+                continue
+            for pattern in regs:
+                hit = reg_hits.get(pattern)
+                if hit is None:
+                    gate, search = searches[pattern]
+                    hit = reg_hits[pattern] = gate in line and search(line) is not None
+                if hit != all_match:
+                    # all: one miss decides; any: one hit decides
+                    break
+            else:
+                if all_match:
+                    matched.append(idx)
+                continue
+            if not all_match:
+                matched.append(idx)
+
+        if self._no_hit:
+            matched = sorted(matched + self._no_hit)
+        return matched
+
+    def _learn(self, line) -> None:
+        """Count the regex hits on the line and reorder the regexes once `LEARN_LINES` lines are counted."""
+        counts = self._reg_counts
+        for pattern in counts:
+            gate, search = self._searches[pattern]
+            if gate in line and search(line) is not None:
+                counts[pattern] += 1
+
+        self._learn_left -= 1
+        if self._learn_left <= 0:
+            self._reorder()
+
+    def _reorder(self) -> None:
+        """Order each filter's regexes by their counted hits and stop learning."""
+        counts = self._reg_counts
+        # sorted() is stable, also in reverse, so ties keep the filter's order
+        self._plans = [
+            (all_match, subs, tuple(sorted(regs, key=counts.__getitem__, reverse=not all_match)))
+            if all_match is not None and len(regs) > 1
+            else (all_match, subs, regs)
+            for all_match, subs, regs in self._plans
+        ]
+        self._regex_only = [
+            (idx, all_match, regs if all_match is None else self._plans[idx][2])
+            for idx, all_match, regs in self._regex_only
+        ]
+        self._learn_left = 0
+
+    def _add_node(self, expression: tuple, binary: bool) -> int:
+        """Id of the DAG node of an expression, adding it and its children if new."""
+        node_id = self._node_ids.get(expression)
+        if node_id is not None:
+            return node_id
+
+        op, arg = expression
+        if op in ("sub", "reg"):
+            node = (op, arg.encode("utf-8") if binary else arg)
+        elif op == "not":
+            node = (op, self._add_node(arg, binary))
+        else:
+            node = (op, tuple(self._add_node(child, binary) for child in arg))
+
+        node_id = self._node_ids[expression] = len(self._nodes)
+        self._nodes.append(node)
+        return node_id
+
+    def _evaluate(self, node_id: int, line, sub_hits: set, results: dict) -> bool:
+        """Value of a DAG node on the line; `results` caches node values and regex hits."""
+        value = results.get(node_id)
+        if value is not None:
+            return value
+
+        op, arg = self._nodes[node_id]
+        if op == "sub":
+            value = arg in sub_hits
+        elif op == "reg":
+            value = results.get(arg)
+            if value is None:
+                gate, search = self._searches[arg]
+                value = results[arg] = gate in line and search(line) is not None
+        elif op == "not":
+            value = not self._evaluate(arg, line, sub_hits, results)
+        elif op == "and":
+            value = all(self._evaluate(child, line, sub_hits, results) for child in arg)
+        else:
+            value = any(self._evaluate(child, line, sub_hits, results) for child in arg)
+
+        results[node_id] = value
+        return value
+
+
+def _as_str(pattern) -> str:
+    return pattern.decode("utf-8", errors="ignore") if isinstance(pattern, bytes) else pattern
@@ -0,0 +1,171 @@
+import heapq
+import json
+import time
+from pathlib import Path
+
+from src.filter import Filter
+
+# Characters of a line kept in the report of the slowest lines
+LINE_PREVIEW = 200
+
+
+class _Stats:
+    def __init__(self) -> None:
+        self.evaluations = 0
+        self.matches = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "evaluations": self.evaluations,
+            "matches": self.matches,
+            "seconds": round(self.seconds, 6),
+            "us_per_evaluation": round(self.seconds / self.evaluations * 1e6, 3) if self.evaluations else 0.0,
+        }
+
+
+class FilterProfiler:
+    def __init__(self, filters: dict[str, Filter], slowest: int = 5) -> None:
+        """
+        Drop-in replacement for `Matcher` that times every filter and keyword.
+
+        Each filter is evaluated on its own, in config order (substrings,
+        then regexes) with the same short-circuiting and regex gates as
+        `Filter.match`, so the numbers show what each keyword costs.
+        Expression filters are timed as a whole, and each of their
+        keywords on its own. Much slower than `Matcher`; only for diagnosis.
+
+        Parameters
+        ----------
+        filters : dict[str, Filter]
+            Filters as returned by `load_filters`.
+        slowest : int
+            Number of slowest lines to keep per filter.
+        """
+        self.names = list(filters.keys())
+        self._filters = list(filters.values())
+        self._slowest_count = slowest
+
+        self._filter_stats = [_Stats() for _ in self._filters]
+        self._keyword_stats = [
+            [_Stats() for _ in flt.substrings] + [_Stats() for _ in flt.regexes] for flt in self._filters
+        ]
+        # Min-heaps of (seconds, line) per filter
+        self._slowest = [[] for _ in self._filters]
+
+    def match(self, line) -> list[int]:
+        """Return the indices of all matching filters, like `Matcher.match`."""
+        clock = time.perf_counter
+        matched = []
+
+        for idx, flt in enumerate(self._filters):
+            keyword_stats = self._keyword_stats[idx]
+            checks = [(sub, None) for sub in flt.substrings] + list(zip(flt.regexes, flt.gates))
+            all_match = flt.all_match
+            result = all_match
+
+            if flt.expression is not None:
+                # Time the whole expression; every keyword is timed on its own afterwards
+                start = clock()
+                result = flt.match(line)
+                elapsed = clock() - start
+                all_match = None
+            else:
+                start = clock()
+
+            for stats, (check, gate) in zip(keyword_stats, checks):
+                check_start = clock()
+                hit = (check in line) if gate is None else (gate in line and check(line) is not None)
+                stats.seconds += clock() - check_start
+                stats.evaluations += 1
+                if hit:
+                    stats.matches += 1
+                if all_match is not None and hit != all_match:
+                    # all: one miss decides; any: one hit decides
+                    result = hit
+                    break
+
+            if flt.expression is None:
+                elapsed = clock() - start
+
+            filter_stats = self._filter_stats[idx]
+            filter_stats.evaluations += 1
+            filter_stats.seconds += elapsed
+            if result:
+                filter_stats.matches += 1
+                matched.append(idx)
+
+            slowest = self._slowest[idx]
+            if len(slowest) < self._slowest_count:
+                heapq.heappush(slowest, (elapsed, self._preview(line)))
+            elif elapsed > slowest[0][0]:
+                heapq.heapreplace(slowest, (elapsed, self._preview(line)))
+
+        return matched
+
+    @staticmethod
+    def _preview(line) -> str:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="ignore")
+        return line[:LINE_PREVIEW]
+
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        """Statistics per filter, most expensive first."""
+        entries = []
+        for idx, flt in enumerate(self._filters):
+            keywords = [("substring", sub) for sub in flt.substrings] + [("regex", p) for p in flt.patterns]
+            entry = {"name": self.names[idx], "all_match": flt.all_match}
+            entry.update(self._filter_stats[idx].to_dict())
+            entry["keywords"] = sorted(
+                (
+                    {"keyword": keyword, "kind": kind, **stats.to_dict()}
+                    for (kind, keyword), stats in zip(keywords, self._keyword_stats[idx])
+                ),
+                key=lambda k: k["seconds"],
+                reverse=True,
+            )
+            entry["slowest_lines"] = [
+                {"us": round(seconds * 1e6, 3), "line": line}
+                for seconds, line in sorted(self._slowest[idx], reverse=True)
+            ]
+            entries.append(entry)
+
+        entries.sort(key=lambda e: e["seconds"], reverse=True)
+        return {"filters": entries}
+
+    def report(self) -> str:
+        """Human-readable report ranked by cost."""
+        data = self.to_dict()
+        total = sum(e["seconds"] for e in data["filters"]) or 1.0
+        lines = ["Filter profile (most expensive first)", ""]
+
+        for entry in data["filters"]:
+            lines.append(
+                f"{entry['name']}: {entry['seconds']:.3f} s ({entry['seconds'] / total:.0%}), "
+                f"{entry['evaluations']} evaluations, {entry['matches']} matches, "
+                f"{entry['us_per_evaluation']:.2f} us/line"
+            )
+            for kw in entry["keywords"]:
+                lines.append(
+                    f"    {kw['kind']:<9} {kw['keyword']!r}: {kw['seconds']:.3f} s, "
+                    f"{kw['evaluations']} evaluations, {kw['matches']} hits, {kw['us_per_evaluation']:.2f} us"
+                )
+            for slow in entry["slowest_lines"]:
+                lines.append(f"    slow line ({slow['us']:.1f} us): {slow['line']!r}")
+            lines.append("")
+
+        return "\n".join(lines)
+
+    def write_report(self, path: None | Path = None) -> None:
+        """Print the report, or write it to `path` (JSON if it ends in .json)."""
+        if path is None:
+            print(self.report())
+            return
+
+        if path.suffix == ".json":
+            path.write_text(json.dumps(self.to_dict(), indent=4), encoding="utf-8")
+        else:
+            path.write_text(self.report(), encoding="utf-8")
+        print(f"Filter profile written to {path}")
@@ -0,0 +1,199 @@
+import threading
+from array import array
+from bisect import bisect_right
+from pathlib import Path
+
+from src.scan import READ_SPAN, read_offset_lines
+
+# Lines searched between two checks for cancellation
+SEARCH_LINES = 4096
+
+# Query results kept for reuse, and the most offsets they may hold together
+RESULT_CACHE = 8
+RESULT_CACHE_OFFSETS = 1 << 22
+
+
+class Refinement:
+    def __init__(self) -> None:
+        """
+        Offsets of the lines of a view, and of those containing its refine query.
+
+        Only decides what to search; the searches themselves run elsewhere
+        (see `LineSearch`): `next_search` returns the offsets to search for
+        the current query, and `finish` takes the offsets of the lines found.
+
+        The results of recent queries are kept. Going back to one of them
+        (e.g. deleting the last typed character) shows it at once and only
+        searches the lines added since; a query containing a kept one only
+        searches that query's result.
+        """
+        # Offsets of all lines, and of the lines shown (the same array unless refined)
+        self.all = array("Q")
+        self.offsets = self.all
+        self.query = b""
+        # query -> (lines of `all` searched, offsets found), least recently used first
+        self._results = {}
+        # (query, lines of `all` searched) of the search in progress
+        self._pending = None
+
+    @property
+    def searching(self) -> bool:
+        return self._pending is not None
+
+    def reset(self) -> None:
+        """Drop all lines and results; the query stays."""
+        self.all = array("Q")
+        self._results = {}
+        self._pending = None
+        self.offsets = self.all if not self.query else array("Q")
+
+    def add(self, offsets) -> None:
+        """Append the offsets of more lines; they are searched by the next `next_search`."""
+        self.all.extend(offsets)
+
+    def set_query(self, query: bytes) -> None:
+        """
+        Change the query; "" shows all lines. The lines shown only change
+        once the query's result is known, which may be right away.
+        """
+        self.query = query
+        self._pending = None
+        if not query:
+            self.offsets = self.all
+            return
+        entry = self._results.pop(query, None)
+        if entry is not None:
+            self._results[query] = entry
+            self.offsets = entry[1]
+
+    def next_search(self) -> None | array:
+        """
+        Offsets of the lines to search for the current query, or None if its
+        result covers every line. Only one search is in progress at a time.
+        """
+        if not self.query:
+            return None
+
+        searched, result = self._results.get(self.query, (0, None))
+        if result is not None:
+            candidates = self.all[searched:]
+        else:
+            base = self._base(self.query)
+            if base is None:
+                candidates = self.all[:]
+            else:
+                # Lines containing the query are among those containing the base
+                base_searched, base_result = self._results[base]
+                candidates = base_result + self.all[base_searched:]
+
+        self._pending = (self.query, len(self.all))
+        if not candidates:
+            self.finish(candidates)
+            return None
+        return candidates
+
+    def cancel(self) -> None:
+        """Forget the search in progress; the next `next_search` starts it again."""
+        self._pending = None
+
+    def finish(self, found: array) -> None:
+        """Take the offsets found by the search `next_search` started."""
+        if self._pending is None:
+            return
+        query, searched = self._pending
+        self._pending = None
+
+        entry = self._results.pop(query, None)
+        result = entry[1] if entry is not None else array("Q")
+        result.extend(found)
+        self._results[query] = (searched, result)
+        self.offsets = result
+
+        # Forget the least recently used results, never the current one
+        while len(self._results) > 1 and (
+            len(self._results) > RESULT_CACHE
+            or sum(len(kept) for _, kept in self._results.values()) > RESULT_CACHE_OFFSETS
+        ):
+            del self._results[next(iter(self._results))]
+
+    def _base(self, query: bytes) -> None | bytes:
+        """The longest kept query contained in `query`, if any."""
+        bases = [kept for kept in self._results if kept in query]
+        return max(bases, key=len) if bases else None
+
+
+class LineSearch(threading.Thread):
+    def __init__(self, path: Path, offsets: array, query: bytes) -> None:
+        """
+        Background thread that finds the lines containing `query` among the
+        lines of `path` starting at `offsets` (ascending).
+
+        Once the thread has ended, `result` holds the offsets found, or None
+        if it was cancelled or failed (then `error` holds the exception).
+        """
+        super().__init__(daemon=True)
+        self._path = path
+        self._offsets = offsets
+        self._query = query
+        self._cancel = threading.Event()
+        self.result = None
+        self.error = None
+
+    def cancel(self) -> None:
+        """Ask the thread to stop; `result` then stays None."""
+        self._cancel.set()
+
+    def run(self) -> None:
+        try:
+            with self._path.open("rb") as f:
+                self.result = search_lines(f, self._offsets, self._query, self._cancel)
+        except Exception as e:
+            self.error = e
+
+
+def search_lines(f, offsets, query: bytes, cancel: None | threading.Event = None) -> None | array:
+    """
+    Offsets of the lines among `offsets` (ascending line starts in the binary
+    file `f`) that contain `query`; None if `cancel` was set meanwhile.
+
+    Nearby lines are read as one block that is searched as a whole, so only
+    the lines containing a hit are looked at one by one, unless hits are
+    frequent enough that checking every line is cheaper.
+    """
+    result = array("Q")
+    size = len(query)
+    for chunk in range(0, len(offsets), SEARCH_LINES):
+        if cancel is not None and cancel.is_set():
+            return None
+
+        part = offsets[chunk : chunk + SEARCH_LINES]
+        first = part[0]
+        block = None
+        if part[-1] - first <= READ_SPAN:
+            f.seek(first)
+            block = f.read(part[-1] - first) + f.readline()
+        if block is None or block.count(query) > len(part) // 2:
+            # Far apart lines, or so many hits that checking each line is cheaper
+            result.extend(offset for offset, line in zip(part, read_offset_lines(f, part)) if query in line)
+            continue
+
+        hit = block.find(query)
+        while hit >= 0:
+            # Line of the hit; its end decides whether the hit lies inside it
+            idx = bisect_right(part, first + hit) - 1
+            start = part[idx] - first
+            end = block.find(b"\n", start)
+            if end < 0:
+                end = len(block)
+            if block[end - 1 : end] == b"\r" and end > start:
+                end -= 1
+
+            if hit + size <= end:
+                result.append(part[idx])
+                hit = block.find(query, end)
+            elif idx + 1 < len(part):
+                # The hit crosses the line end or lies between the lines searched
+                hit = block.find(query, part[idx + 1] - first)
+            else:
+                break
+    return result
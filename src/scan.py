@@ -0,0 +1,152 @@
+import re
+
+# Lines whose offsets lie within this many bytes are read with one read call
+READ_SPAN = 1 << 20
+
+
+def iter_range_lines(f, start: int, end: int):
+    """
+    Yield the decoded lines of a binary file between byte offsets [start, end).
+    `start` must be the start of a line.
+    """
+    f.seek(start)
+    pos = start
+    while pos < end:
+        raw = f.readline()
+        if not raw:
+            break
+        pos += len(raw)
+        # Same result as reading in text mode with universal newlines
+        if raw.endswith(b"\r\n"):
+            raw = raw[:-2] + b"\n"
+        yield raw.decode("utf-8", errors="ignore")
+
+
+def iter_offset_lines(f, start: int = 0, end: None | int = None, copy_to=None):
+    """
+    Yield (offset, line) pairs of a binary file between byte offsets [start, end),
+    where `offset` is the start of the line and `line` the decoded text as in
+    `iter_range_lines`. `end=None` reads to the end of the file.
+
+    With `start=0`, `f` may also be a stream that cannot seek. Every raw line read
+    is also written to `copy_to`, if given.
+    """
+    if start or f.seekable():
+        f.seek(start)
+    pos = start
+    for raw in f:
+        if end is not None and pos >= end:
+            break
+        if copy_to is not None:
+            copy_to.write(raw)
+        offset = pos
+        pos += len(raw)
+        if raw.endswith(b"\r\n"):
+            raw = raw[:-2] + b"\n"
+        yield offset, raw.decode("utf-8", errors="ignore")
+
+
+def iter_mmap_lines(mm, gate: None | re.Pattern, start: int = 0, end: None | int = None):
+    """
+    Yield candidate lines of a memory-mapped file as `bytes`, without "\\n" or "\\r\\n".
+
+    Parameters
+    ----------
+    mm : mmap.mmap
+        The mapped file content.
+    gate : re.Pattern or None
+        Bytes pattern searched over the whole range (see `Matcher.scan_gate`).
+        Only lines containing a gate match are yielded, so lines without any
+        keyword are never copied. If None, every line is yielded.
+    start, end : int
+        Byte range [start, end) to scan; `start` must be the start of a line.
+    """
+    if end is None:
+        end = len(mm)
+
+    if gate is None:
+        # No gate: walk every line with the C-level readline of the map
+        mm.seek(start)
+        readline = mm.readline
+        pos = start
+        while pos < end:
+            line = readline()
+            if not line:
+                return
+            pos += len(line)
+            if pos > end:
+                line = line[: len(line) - (pos - end)]
+            elif line.endswith(b"\n"):
+                line = line[:-1]
+            if line.endswith(b"\r"):
+                line = line[:-1]
+            yield line
+        return
+
+    pos = start
+    while pos < end:
+        hit = gate.search(mm, pos, end)
+        if hit is None:
+            return
+        hit_pos = hit.start()
+
+        # Widen the hit to its enclosing line
+        newline = mm.rfind(b"\n", pos, hit_pos)
+        line_start = newline + 1 if newline >= 0 else pos
+        line_end = mm.find(b"\n", hit_pos, end)
+        if line_end < 0:
+            line_end = end
+        pos = line_end + 1
+
+        line = mm[line_start:line_end]
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        yield line
+
+
+def read_offset_lines(f, offsets) -> list[bytes]:
+    """
+    Read the lines of a binary file starting at the offsets (ascending), without
+    "\\n" or "\\r\\n". Lines lying within `READ_SPAN` bytes are read with one call.
+    """
+    if not offsets:
+        return []
+    first = offsets[0]
+    if offsets[-1] - first > READ_SPAN:
+        return [_read_line(f, offset) for offset in offsets]
+
+    f.seek(first)
+    block = f.read(offsets[-1] - first) + f.readline()
+    lines = []
+    for offset in offsets:
+        start = offset - first
+        end = block.find(b"\n", start)
+        if end < 0:
+            end = len(block)
+        if block[end - 1 : end] == b"\r" and end > start:
+            end -= 1
+        lines.append(block[start:end])
+    return lines
+
+
+def line_start(f, pos: int) -> int:
+    """Start of the line of a binary file that byte offset `pos` lies in (`pos` itself after a "\\n")."""
+    end = pos
+    while end > 0:
+        begin = max(0, end - (1 << 16))
+        f.seek(begin)
+        newline = f.read(end - begin).rfind(b"\n")
+        if newline >= 0:
+            return begin + newline + 1
+        end = begin
+    return 0
+
+
+def _read_line(f, offset: int) -> bytes:
+    f.seek(offset)
+    raw = f.readline()
+    if raw.endswith(b"\n"):
+        raw = raw[:-1]
+    if raw.endswith(b"\r"):
+        raw = raw[:-1]
+    return raw
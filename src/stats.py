@@ -0,0 +1,171 @@
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from src.filter import Filter
+from src.matcher import Matcher
+from src.timerange import TimestampParser
+
+
+class MatchStats:
+    def __init__(
+        self, filters: dict[str, Filter], histogram: bool = False, timestamps: None | TimestampParser = None
+    ) -> None:
+        """
+        Count the matches of each filter instead of writing the lines.
+
+        Per filter, the number of matched lines and the offsets of the first
+        and last match are kept; nothing is written or encoded per line.
+        With `histogram`, matches are also counted per minute of their
+        timestamp, and the times of the first and last match are kept. Lines
+        without a timestamp belong to the entry above them, and timestamps
+        are only converted on lines some filter matches.
+
+        Context lines (`before`/`after`) are not counted, only matches.
+
+        Parameters
+        ----------
+        filters : dict[str, Filter]
+            Filters as returned by `load_filters`.
+        histogram : bool
+            Also count matches per minute.
+        timestamps : TimestampParser or None
+            Reads the line timestamps for `histogram`; default: ISO 8601 at
+            the line start.
+        """
+        self.names = list(filters.keys())
+        self.histogram = histogram
+        self._matcher = Matcher.cached(filters)
+        self._timestamps = timestamps if timestamps is not None else TimestampParser()
+
+        self.lines = 0
+        self.counts = [0] * len(self.names)
+        self.first_offsets = [None] * len(self.names)
+        self.last_offsets = [None] * len(self.names)
+        self.first_times = [None] * len(self.names)
+        self.last_times = [None] * len(self.names)
+        # Per filter: minute ("YYYY-MM-DDTHH:MM") -> matches
+        self.minutes = [{} for _ in self.names]
+
+    # ------------------------------------------------------------------
+
+    def add_lines(self, lines) -> None:
+        """Count the matches in (offset, line) pairs as yielded by `iter_offset_lines`."""
+        match = self._matcher.match
+        counts = self.counts
+        first_offsets = self.first_offsets
+        last_offsets = self.last_offsets
+        first_times = self.first_times
+        last_times = self.last_times
+        histogram = self.histogram
+        find_text = self._timestamps.find_text
+        to_datetime = self._timestamps.to_datetime
+
+        # Timestamp text of the current entry, converted once a line of it matched
+        text = None
+        stamp = None
+        converted = True
+        # Matches per filter in the current minute [minute, minute_end), added to
+        # `minutes` when the minute changes
+        minute = minute_end = None
+        minute_counts = [0] * len(counts)
+        count = 0
+
+        for offset, line in lines:
+            if line.isspace():
+                continue
+            count += 1
+
+            if histogram:
+                found = find_text(line)
+                if found is not None:
+                    text = found
+                    converted = False
+
+            matched = match(line.rstrip("\n"))
+            if not matched:
+                continue
+
+            if not converted:
+                stamp = to_datetime(text)
+                converted = True
+                if stamp is not None and (minute is None or not minute <= stamp < minute_end):
+                    self._add_minute(minute, minute_counts)
+                    minute = stamp.replace(second=0, microsecond=0)
+                    minute_end = minute + timedelta(minutes=1)
+
+            for idx in matched:
+                counts[idx] += 1
+                if first_offsets[idx] is None:
+                    first_offsets[idx] = offset
+                last_offsets[idx] = offset
+                if stamp is not None:
+                    minute_counts[idx] += 1
+                    if first_times[idx] is None:
+                        first_times[idx] = stamp
+                    last_times[idx] = stamp
+
+        self._add_minute(minute, minute_counts)
+        self.lines += count
+
+    def _add_minute(self, minute: None | datetime, minute_counts: list[int]) -> None:
+        """Add the counts of one minute to `minutes` and reset them."""
+        if minute is None:
+            return
+        key = minute.isoformat(timespec="minutes")
+        for buckets, matches in zip(self.minutes, minute_counts):
+            if matches:
+                buckets[key] = buckets.get(key, 0) + matches
+        minute_counts[:] = [0] * len(minute_counts)
+
+    # ------------------------------------------------------------------
+
+    def to_dict(self) -> dict:
+        filters = {}
+        for idx, name in enumerate(self.names):
+            entry = {
+                "count": self.counts[idx],
+                "first_offset": self.first_offsets[idx],
+                "last_offset": self.last_offsets[idx],
+            }
+            if self.histogram:
+                entry["first_time"] = _isoformat(self.first_times[idx])
+                entry["last_time"] = _isoformat(self.last_times[idx])
+                entry["minutes"] = dict(sorted(self.minutes[idx].items()))
+            filters[name] = entry
+        return {"lines": self.lines, "filters": filters}
+
+    def to_csv(self) -> str:
+        """One row per filter; with `histogram`, one more column per minute with any match."""
+        columns = ["filter", "count", "first_offset", "last_offset"]
+        minutes = []
+        if self.histogram:
+            columns += ["first_time", "last_time"]
+            minutes = sorted(set().union(*self.minutes))
+
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(columns + minutes)
+        for name, entry in self.to_dict()["filters"].items():
+            row = [name] + [entry[column] for column in columns[1:]]
+            row += [entry["minutes"].get(minute, 0) for minute in minutes]
+            writer.writerow(["" if value is None else value for value in row])
+        return out.getvalue()
+
+    def write_report(self, path: None | Path = None) -> None:
+        """Print the summary as JSON, or write it to `path` (CSV if it ends in .csv, else JSON)."""
+        if path is None:
+            print(json.dumps(self.to_dict(), indent=4))
+            return
+
+        if path.suffix == ".csv":
+            path.write_text(self.to_csv(), encoding="utf-8")
+        else:
+            path.write_text(json.dumps(self.to_dict(), indent=4), encoding="utf-8")
+        print(f"Match statistics written to {path}")
+
+
+def _isoformat(stamp) -> None | str:
+    return None if stamp is None else stamp.isoformat()
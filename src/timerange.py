@@ -0,0 +1,136 @@
+import re
+from datetime import datetime
+from pathlib import Path
+
+# Default for "timestamp_regex" in config.json: an ISO 8601 date and time at the start of the line
+TIMESTAMP_REGEX = r"^\s*(\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?)"
+
+
+class TimestampParser:
+    def __init__(self, regex: str = TIMESTAMP_REGEX, fmt: None | str = None) -> None:
+        """
+        Read the timestamp at the start of log lines.
+
+        Parameters
+        ----------
+        regex : str
+            Pattern finding the timestamp in a line; its first group (or the
+            whole match, without groups) is the timestamp text.
+        fmt : str or None
+            `datetime.strptime` format of the timestamp text. Empty or None
+            parses ISO 8601 with `datetime.fromisoformat`.
+        """
+        self._regex = re.compile(regex)
+        self._regex_bytes = re.compile(regex.encode("utf-8"))
+        self._fmt = fmt or None
+
+    @classmethod
+    def from_config(cls, config: dict) -> "TimestampParser":
+        return cls(config["timestamp_regex"], config["timestamp_format"])
+
+    def parse(self, line) -> None | datetime:
+        """Timestamp of a `str` or `bytes` line, or None if it has none."""
+        text = self.find_text(line)
+        return None if text is None else self.to_datetime(text)
+
+    def find_text(self, line) -> None | str:
+        """Timestamp text of a `str` or `bytes` line, without converting it, or None."""
+        if isinstance(line, bytes):
+            found = self._regex_bytes.search(line)
+            return found and (found.group(1) if found.re.groups else found.group(0)).decode("utf-8", "ignore")
+        found = self._regex.search(line)
+        return found and (found.group(1) if found.re.groups else found.group(0))
+
+    def to_datetime(self, text: str) -> None | datetime:
+        """Convert timestamp text found by `find_text`; None if it is no valid time."""
+        try:
+            if self._fmt is None:
+                return datetime.fromisoformat(text)
+            return datetime.strptime(text, self._fmt)
+        except ValueError:
+            return None
+
+
+def _after(stamp: datetime, bound: datetime, inclusive: bool) -> bool:
+    """True if `stamp` lies after `bound` (or on it, if `inclusive`)."""
+    if (stamp.tzinfo is None) != (bound.tzinfo is None):
+        # Compare naive and aware times by their wall clock
+        stamp, bound = stamp.replace(tzinfo=None), bound.replace(tzinfo=None)
+    return stamp >= bound if inclusive else stamp > bound
+
+
+def _next_stamped_line(f, pos: int, parser: TimestampParser) -> tuple[int, None | datetime]:
+    """Offset and timestamp of the first line starting at or after `pos` that has a timestamp."""
+    if pos > 0:
+        # Finish the line containing pos - 1, so the next line starts at or after pos
+        f.seek(pos - 1)
+        f.readline()
+    else:
+        f.seek(0)
+
+    while True:
+        offset = f.tell()
+        raw = f.readline()
+        if not raw:
+            return offset, None
+        stamp = parser.parse(raw)
+        if stamp is not None:
+            return offset, stamp
+
+
+def find_offset(f, size: int, parser: TimestampParser, bound: datetime, inclusive: bool = True) -> int:
+    """
+    Binary-search a binary file with time-ordered lines for the start of the
+    first timestamped line at or after `bound` (strictly after it, unless
+    `inclusive`). Returns `size` if there is none.
+
+    Lines without a timestamp (e.g. stack traces) belong to the entry above
+    them. Needs O(log size) line reads.
+    """
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        _, stamp = _next_stamped_line(f, mid, parser)
+        if stamp is None or _after(stamp, bound, inclusive):
+            hi = mid
+        else:
+            lo = mid + 1
+
+    offset, stamp = _next_stamped_line(f, lo, parser)
+    return size if stamp is None else offset
+
+
+def time_window(
+    path: Path, parser: TimestampParser, since: None | datetime = None, until: None | datetime = None
+) -> tuple[int, int]:
+    """Byte range [start, end) of the lines logged from `since` up to and including `until`."""
+    size = path.stat().st_size
+    with path.open("rb") as f:
+        start = 0 if since is None else find_offset(f, size, parser, since)
+        end = size if until is None else find_offset(f, size, parser, until, inclusive=False)
+    return start, max(start, end)
+
+
+def clip_ranges(ranges: list[tuple[int, int]], start: int, end: int) -> list[tuple[int, int]]:
+    """Intersect sorted byte ranges with [start, end)."""
+    clipped = [(max(s, start), min(e, end)) for s, e in ranges]
+    return [(s, e) for s, e in clipped if s < e]
+
+
+def iter_time_window(lines, parser: TimestampParser, since: None | datetime = None, until: None | datetime = None):
+    """
+    Yield the lines from `since` up to and including `until`, reading them
+    in order; for streams that cannot seek, e.g. compressed input. Items may
+    also be (offset, line) pairs.
+    """
+    started = since is None
+    for item in lines:
+        line = item[1] if isinstance(item, tuple) else item
+        stamp = parser.parse(line)
+        if stamp is not None:
+            if until is not None and _after(stamp, until, inclusive=False):
+                return
+            if not started and _after(stamp, since, inclusive=True):
+                started = True
+        if started:
+            yield item
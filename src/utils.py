@@ -1,7 +1,11 @@
 import json
+import os
+import sys
 from pathlib import Path
 
+from src.expression import build_expression_filters
 from src.filter import Filter
+from src.timerange import TIMESTAMP_REGEX
 
 FOLDER_CODE = Path(__file__).resolve().parent.parent
 
@@ -9,31 +13,28 @@ DEFAULT_CONFIG = {
     "entry_config": "example_filters.json",
     "show_original": False,
     "max_line": 1000,
-    "show_first_max_line": False,
+    "use_index": False,
+    "profile": False,
+    "timestamp_regex": TIMESTAMP_REGEX,
+    "timestamp_format": "",
 }
 
+# Parsed files by path: (file content, config dict or filter set). Entries are
+# reused as long as the content is unchanged. The files are small, so comparing
+# the bytes is cheaper than hashing them (hashlib alone loads OpenSSL).
+_CONFIG_CACHE = {}
+_FILTER_CACHE = {}
 
-def is_headless() -> bool:
+
+def has_display() -> bool:
     """
-    Detect whether Tkinter can be imported AND a window can be created.
-    Returns True if running in a headless environment.
+    Cheap check whether a GUI window can be shown, without importing Tkinter:
+    Windows and macOS always have a display, other systems need $DISPLAY
+    (Tk runs on X11, or XWayland under Wayland).
     """
-    try:
-        import tkinter as tk
-    except ImportError:
-        print("Tkinter is not available in this Python installation.")
-        return True
-
-    try:
-        root = tk.Tk()
-        root.withdraw()
-        root.update_idletasks()
-        root.destroy()
-        print("Tkinter is available and a window can be launched.")
-        return False
-    except Exception:
-        print("Tkinter is available but cannot open a window (likely headless environment).")
+    if sys.platform in ("win32", "darwin"):
         return True
+    return bool(os.environ.get("DISPLAY"))
 
 
 def fix_config(json_path: Path) -> None:
@@ -61,6 +62,9 @@ def load_config() -> dict:
     """
     Load the main configuration from config.json.
     Ensures config.json exists by copying example_config.json if needed.
+
+    The parsed config is cached by the content of the file, so repeated
+    calls skip `fix_config` and JSON parsing until the file changes.
     """
 
     json_path = FOLDER_CODE / "config.json"
@@ -70,19 +74,28 @@ def load_config() -> dict:
         with json_path.open("w", encoding="utf-8") as f:
             json.dump(DEFAULT_CONFIG, f, indent=4)
 
+    cached = _CONFIG_CACHE.get(json_path)
+    if cached is not None and cached[0] == json_path.read_bytes():
+        return dict(cached[1])
+
     fix_config(json_path)
 
     # Load main config
-    with json_path.open("r", encoding="utf-8") as fc:
-        main_config = json.load(fc)
+    data = json_path.read_bytes()
+    main_config = json.loads(data)
+    _CONFIG_CACHE[json_path] = (data, main_config)
 
-    return main_config
+    return dict(main_config)
 
 
-def load_filters(main_config: None | dict) -> dict[str, Filter]:
+def load_filters(main_config: None | dict = None) -> dict[str, Filter]:
     """
     Load filter definitions from config.json and the referenced entry_config.
     Ensures config.json exists by copying example_config.json if needed.
+
+    Filter sets are cached by the content of the entry config: as long as
+    it is unchanged, the same (already compiled) `Filter` objects are returned
+    in a new dict, which also lets `Matcher.cached` reuse its matchers.
     """
     if main_config is None:
         main_config = load_config()
@@ -91,12 +104,22 @@ def load_filters(main_config: None | dict) -> dict[str, Filter]:
     if not entry_config_path.exists():
         raise FileNotFoundError(f"Entry config file not found: {entry_config_path}")
 
-    # Load filter settings
-    with entry_config_path.open("r", encoding="utf-8") as ff:
-        settings = json.load(ff)
+    data = entry_config_path.read_bytes()
+    cached = _FILTER_CACHE.get(entry_config_path)
+    if cached is not None and cached[0] == data:
+        return dict(cached[1])
 
-    # Build Filter objects
-    filters = {s["name"]: Filter(settings=s["filters"], all_match=s["all_match"]) for s in settings}
+    # Load filter settings
+    settings = json.loads(data)
+
+    # Build Filter objects; expressions may refer to any filter, so they come second
+    filters = {
+        s["name"]: None
+        if "expression" in s
+        else Filter(settings=s["filters"], all_match=s["all_match"], before=s.get("before", 0), after=s.get("after", 0))
+        for s in settings
+    }
+    build_expression_filters(settings, filters)
 
     # Validate uniqueness
     names = list(filters.keys())
@@ -108,7 +131,27 @@ def load_filters(main_config: None | dict) -> dict[str, Filter]:
     if len(filename_safe) != len(filters):
         raise ValueError("make_name_filename(name) must produce unique filenames.")
 
-    return filters
+    _FILTER_CACHE[entry_config_path] = (data, filters)
+    return dict(filters)
+
+
+def match_filters(old: dict[str, Filter], new: dict[str, Filter]) -> dict[str, None | str]:
+    """
+    Map each filter of `new` to the filter of `old` whose results it can
+    reuse, i.e. with an equal `Filter.key`: preferably the one of the same
+    name, else a renamed one. New and changed filters map to None.
+    """
+    unused = {name: flt.key for name, flt in old.items()}
+    reuse = {}
+    for name, flt in new.items():
+        if name in unused and unused[name] == flt.key:
+            reuse[name] = name
+            del unused[name]
+    for name, flt in new.items():
+        if name not in reuse:
+            reuse[name] = next((old_name for old_name, key in unused.items() if key == flt.key), None)
+            unused.pop(reuse[name], None)
+    return {name: reuse[name] for name in new}
 
 
 def make_name_filename(name: str) -> str:
@@ -0,0 +1,251 @@
+import tkinter as tk
+from pathlib import Path
+from tkinter import font, ttk
+
+from src.refine import LineSearch, Refinement
+from src.scan import read_offset_lines
+
+# Lines read at a time by `iter_lines`
+READ_LINES = 4096
+
+# Milliseconds after the last key press before the refine box is applied
+REFINE_DELAY = 150
+
+# Milliseconds between two checks whether a refine search has ended
+SEARCH_POLL = 50
+
+
+class VirtualTextView(ttk.Frame):
+    def __init__(self, master, **kwargs) -> None:
+        """
+        Read-only text view over selected lines of a file.
+
+        Only the byte offsets of the lines are kept in memory; the lines
+        visible in the window are read from the file whenever the view
+        scrolls. Memory use and redraw cost therefore do not depend on how
+        many lines the view holds.
+
+        Nearby lines are read with one read call, so views of consecutive
+        lines (like the original tab) cost one read and one insert per
+        redraw. While the view is hidden, e.g. in an unselected notebook
+        tab, new lines only extend the offsets; it redraws once shown.
+
+        The refine box above the text narrows the view to the lines that
+        contain its text, without reading the file again from the filters:
+        only the lines of this view are searched, on a background thread
+        (`LineSearch`) that a new query cancels. Recent results are reused
+        (see `Refinement`), so extending or shortening a query rarely
+        searches every line again.
+        """
+        super().__init__(master, **kwargs)
+
+        self._path = None
+        self._file = None
+        # Offsets of all lines and of the lines shown
+        self._lines = Refinement()
+        self._search = None
+        self._refine_job = None
+        self._top = 0
+        self._rows = 1
+        # Content is outdated, redraw when shown
+        self._stale = False
+
+        bar = ttk.Frame(self)
+        ttk.Label(bar, text="Refine:").pack(side="left")
+        self._refine = tk.StringVar(self)
+        self._refine.trace_add("write", lambda *_: self._schedule_refine())
+        ttk.Entry(bar, textvariable=self._refine).pack(side="left", fill="x", expand=True)
+        self._count = ttk.Label(bar)
+        self._count.pack(side="left", padx=4)
+        bar.pack(side="top", fill="x")
+
+        self._text = tk.Text(self, wrap=tk.NONE, state="disabled")
+        self._vbar = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self._hbar = ttk.Scrollbar(self, orient="horizontal", command=self._text.xview)
+        self._text.config(xscrollcommand=self._hbar.set)
+
+        self._vbar.pack(side="right", fill="y")
+        self._hbar.pack(side="bottom", fill="x")
+        self._text.pack(side="left", fill="both", expand=True)
+
+        self._linespace = font.Font(font=self._text["font"]).metrics("linespace")
+
+        self._text.bind("<Configure>", self._on_resize)
+        # Keyboard scrolling needs focus, which a disabled Text does not take by itself
+        self._text.bind("<Button-1>", lambda e: self._text.focus_set(), add="+")
+        self._text.bind("<MouseWheel>", self._on_wheel)
+        self._text.bind("<Button-4>", lambda e: self.scroll(-3))
+        self._text.bind("<Button-5>", lambda e: self.scroll(3))
+        self._text.bind("<Up>", lambda e: self.scroll(-1))
+        self._text.bind("<Down>", lambda e: self.scroll(1))
+        self._text.bind("<Prior>", lambda e: self.scroll(-self._rows))
+        self._text.bind("<Next>", lambda e: self.scroll(self._rows))
+        self._text.bind("<Control-Home>", lambda e: self.scroll_to(0))
+        self._text.bind("<Control-End>", lambda e: self.scroll_to(len(self)))
+        self._text.bind("<Destroy>", lambda e: self._close())
+        self.bind("<Map>", self._on_map)
+
+    # ------------------------------------------------------------------
+
+    def set_source(self, path: Path) -> None:
+        """Show lines of a new file; drops all previously added lines."""
+        self._close()
+        self._path = path
+        self._file = path.open("rb")
+        self._lines.reset()
+        self._top = 0
+        self._refresh()
+
+    def add_offsets(self, offsets) -> None:
+        """Append the start offsets of more lines to show."""
+        visible_before = len(self) < self._top + self._rows
+        self._lines.add(offsets)
+        if self._search is None:
+            self._start_search()
+        # Only redraw if the new lines land inside the window
+        if visible_before:
+            self._refresh()
+        elif self.winfo_viewable():
+            self._update_scrollbar()
+        else:
+            self._stale = True
+
+    def __len__(self) -> int:
+        """Return the number of lines in the view (after refining)."""
+        return len(self._lines.offsets)
+
+    def refine(self, query: str) -> None:
+        """
+        Show only the lines containing `query`; "" shows all lines again.
+        The lines are searched in the background; the view updates once done.
+        """
+        self._lines.set_query(query.encode("utf-8"))
+        self._start_search()
+        self._top = 0
+        self._refresh()
+
+    def iter_lines(self, start: int = 0, stop: None | int = None):
+        """Yield the lines of the view (without line breaks), read from the file."""
+        if self._file is None:
+            return
+        offsets = self._lines.offsets
+        stop = len(offsets) if stop is None else min(stop, len(offsets))
+        for chunk in range(start, stop, READ_LINES):
+            yield from self._read_lines(offsets[chunk : min(chunk + READ_LINES, stop)])
+
+    # ------------------------------------------------------------------
+
+    def scroll(self, delta: int) -> str:
+        self.scroll_to(self._top + delta)
+        # Stop Tk from scrolling the underlying widget as well
+        return "break"
+
+    def scroll_to(self, top: int) -> None:
+        top = max(0, min(top, len(self) - self._rows))
+        if top != self._top:
+            self._top = top
+            self._render()
+
+    def _on_scrollbar(self, action, amount, unit=None) -> None:
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self)))
+        elif action == "scroll":
+            step = self._rows if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+
+    def _on_wheel(self, event) -> str:
+        return self.scroll(-3 if event.delta > 0 else 3)
+
+    def _schedule_refine(self) -> None:
+        # Wait for a pause in typing instead of searching on every key
+        if self._refine_job is not None:
+            self.after_cancel(self._refine_job)
+        self._refine_job = self.after(REFINE_DELAY, self._apply_refine)
+
+    def _apply_refine(self) -> None:
+        self._refine_job = None
+        self.refine(self._refine.get())
+
+    def _start_search(self) -> None:
+        """Cancel the search in progress and start the next one the refine query needs, if any."""
+        if self._search is not None:
+            self._search.cancel()
+            self._search = None
+        offsets = self._lines.next_search()
+        if offsets is None or self._path is None:
+            return
+        self._search = LineSearch(self._path, offsets, self._lines.query)
+        self._search.start()
+        self.after(SEARCH_POLL, self._poll_search, self._search)
+
+    def _poll_search(self, search: LineSearch) -> None:
+        if search is not self._search:
+            # Cancelled for a newer one
+            return
+        if search.is_alive():
+            self.after(SEARCH_POLL, self._poll_search, search)
+            return
+
+        self._search = None
+        if search.result is None:
+            self._lines.cancel()
+            self._count.config(text=f"Search failed: {search.error}")
+            return
+        self._lines.finish(search.result)
+        # Lines added meanwhile are searched next
+        self._start_search()
+        self._refresh()
+
+    def _on_map(self, event) -> None:
+        if self._stale:
+            self._render()
+
+    def _on_resize(self, event) -> None:
+        rows = max(1, event.height // self._linespace)
+        if rows != self._rows:
+            self._rows = rows
+            self._render()
+
+    # ------------------------------------------------------------------
+
+    def _read_lines(self, offsets) -> list[str]:
+        return [raw.decode("utf-8", errors="ignore") for raw in read_offset_lines(self._file, offsets)]
+
+    def _refresh(self) -> None:
+        """Redraw now if the view is shown, else once it is (see `_on_map`)."""
+        if self.winfo_viewable():
+            self._render()
+        else:
+            self._stale = True
+
+    def _render(self) -> None:
+        """Replace the widget content with the lines in the window."""
+        lines = list(self.iter_lines(self._top, self._top + self._rows))
+        self._stale = False
+
+        self._text.config(state="normal")
+        self._text.delete("1.0", tk.END)
+        self._text.insert("1.0", "\n".join(lines))
+        self._text.config(state="disabled")
+        self._update_scrollbar()
+
+    def _update_scrollbar(self) -> None:
+        lines = self._lines
+        if lines.query:
+            searching = ", searching..." if lines.searching else ""
+            self._count.config(text=f"{len(lines.offsets):,} of {len(lines.all):,} lines{searching}")
+        else:
+            self._count.config(text=f"{len(lines.all):,} lines")
+        total = len(self)
+        if total <= self._rows:
+            self._vbar.set(0.0, 1.0)
+        else:
+            self._vbar.set(self._top / total, (self._top + self._rows) / total)
+
+    def _close(self) -> None:
+        if self._search is not None:
+            self._search.cancel()
+            self._search = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
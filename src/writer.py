@@ -0,0 +1,137 @@
+import queue
+import threading
+from pathlib import Path
+
+from src.compression import open_output
+
+# Buffered lines (over all outputs) that trigger a flush to the writer thread
+FLUSH_LINES = 1 << 16
+
+
+class OutputWriter:
+    def __init__(
+        self,
+        paths: list[Path],
+        compression: None | str = None,
+        binary: bool = False,
+        flush_lines: int = FLUSH_LINES,
+        depth: int = 4,
+    ) -> None:
+        """
+        Write lines to one output file per filter from a background thread.
+
+        Callers append stripped lines to `buffers[idx]` and call `flush()`
+        from time to time (see `maybe_flush`). Each flush hands the collected
+        lines to the writer thread, which joins, encodes, compresses and
+        writes them with one large write per file, overlapping with the
+        matching on the calling thread. At most `depth` flushes are queued.
+
+        Parameters
+        ----------
+        paths : list[Path]
+            Output files, opened with `open_output`.
+        compression : str or None
+            Compression format of the outputs.
+        binary : bool
+            If True, lines are `bytes` and written unchanged; otherwise
+            they are `str` and encoded as UTF-8.
+        flush_lines : int
+            Number of buffered lines `maybe_flush` lets pile up.
+        depth : int
+            Number of flushes that may wait for the writer thread.
+        """
+        self.binary = binary
+        self.flush_lines = flush_lines
+        self.buffers = [[] for _ in paths]
+
+        self._files = []
+        try:
+            for path in paths:
+                self._files.append(open_output(path, compression, binary=True))
+        except Exception:
+            for f in self._files:
+                f.close()
+            raise
+
+        self._queue = queue.Queue(maxsize=depth)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> "OutputWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def maybe_flush(self) -> list[list]:
+        """Flush if `flush_lines` lines are buffered; returns the current `buffers`."""
+        if sum(map(len, self.buffers)) >= self.flush_lines:
+            self.flush()
+        return self.buffers
+
+    def flush(self, wait: bool = False) -> None:
+        """
+        Hand the buffered lines to the writer thread; `buffers` is replaced
+        by empty lists. With `wait`, block until they are written and the
+        files are flushed.
+        """
+        self._raise_error()
+        if any(self.buffers):
+            self._queue.put(self.buffers)
+            self.buffers = [[] for _ in self._files]
+        if wait:
+            done = threading.Event()
+            self._queue.put(done)
+            done.wait()
+            self._raise_error()
+
+    def close(self) -> None:
+        """Write what is left, stop the thread and close the files."""
+        if self._thread is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            for f in self._files:
+                f.close()
+        self._raise_error()
+
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        newline = b"\n" if self.binary else "\n"
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                # Keep draining so producers never block on a full queue
+                if isinstance(item, threading.Event):
+                    item.set()
+                continue
+
+            try:
+                if isinstance(item, threading.Event):
+                    for f in self._files:
+                        f.flush()
+                    item.set()
+                    continue
+
+                for f, lines in zip(self._files, item):
+                    if lines:
+                        # An empty last item gives the trailing newline
+                        lines.append(newline[:0])
+                        data = newline.join(lines)
+                        f.write(data if self.binary else data.encode("utf-8"))
+            except Exception as e:
+                self._error = e
+                if isinstance(item, threading.Event):
+                    item.set()
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,70 @@
+import gzip
+
+import pytest
+
+from src.bitmap import MatchBitmaps
+from src.cli import filter_logs
+from src.filter import Filter
+
+
+def make_filters():
+    return {
+        "se": Filter([{"reg": False, "keyword": "se"}], True),
+        "se&amet": Filter([{"reg": False, "keyword": "se"}, {"reg": False, "keyword": "amet"}], True),
+        "amet": Filter([{"reg": True, "keyword": "amet"}], True),
+    }
+
+
+def write_log(path):
+    lines = ["Lorem ipsum dolor sit amet", "consetetur sadipscing", "", "sed diam voluptua", "sea amet\r"]
+    path.write_bytes("\n".join(f"{i} {line}" for i in range(20) for line in lines).encode("utf-8"))
+
+
+def test_bitmaps_materialize_like_text_output(tmp_path):
+    log = tmp_path / "log.txt"
+    write_log(log)
+    filter_logs(make_filters(), log, tmp_path / "text")
+    filter_logs(make_filters(), log, tmp_path / "bitmap", bitmap=True)
+
+    bitmaps = MatchBitmaps(tmp_path / "bitmap")
+    assert len(bitmaps) == 100
+    for name, filename in (("se", "se"), ("se&amet", "se_and_amet"), ("amet", "amet")):
+        text = (tmp_path / "text" / f"{filename}.txt").read_text(encoding="utf-8")
+        assert "".join(f"{line}\n" for line in bitmaps.filter_lines(name)) == text
+
+    only_se = list(bitmaps.lines(bitmaps.mask("se") & ~bitmaps.mask("amet")))
+    assert only_se and all("se" in line and "amet" not in line for line in only_se)
+    neither = list(bitmaps.lines(~(bitmaps.mask("se") | bitmaps.mask("amet"))))
+    assert len(neither) == 20 and all(line.endswith(" ") for line in neither)
+    assert bitmaps.count(~bitmaps.mask("amet")) == 100 - bitmaps.count(bitmaps.mask("amet"))
+
+
+def test_bitmaps_include_context_lines(tmp_path):
+    log = tmp_path / "log.txt"
+    write_log(log)
+    filters = {"voluptua": Filter([{"reg": False, "keyword": "voluptua"}], True, before=1, after=1)}
+    filter_logs(filters, log, tmp_path / "text")
+    filter_logs(filters, log, tmp_path / "bitmap", bitmap=True, use_index=True)
+
+    bitmaps = MatchBitmaps(tmp_path / "bitmap")
+    assert bitmaps.count(bitmaps.mask("voluptua")) == 60
+    text = (tmp_path / "text" / "voluptua.txt").read_text(encoding="utf-8")
+    assert "".join(f"{line}\n" for line in bitmaps.filter_lines("voluptua")) == text
+
+
+def test_bitmaps_detect_changed_source(tmp_path):
+    log = tmp_path / "log.txt"
+    write_log(log)
+    filter_logs(make_filters(), log, tmp_path / "bitmap", bitmap=True)
+
+    log.write_text("changed", encoding="utf-8")
+    with pytest.raises(ValueError):
+        MatchBitmaps(tmp_path / "bitmap")
+
+
+def test_bitmaps_need_plain_input(tmp_path):
+    log = tmp_path / "log.txt.gz"
+    log.write_bytes(gzip.compress(b"amet\n"))
+
+    with pytest.raises(ValueError):
+        filter_logs(make_filters(), log, tmp_path / "bitmap", bitmap=True)
@@ -1,6 +1,6 @@
 import pytest
 
-from buffer import Buffer
+from src.buffer import Buffer, ByteBuffer
 
 
 def test_init_positive_capacity():
@@ -90,3 +90,52 @@ def test_repr_contains_key_info():
     assert "capacity=2" in r
     assert "save_first=True" in r
     assert "10" in r
+
+
+# -----------------------------
+# ByteBuffer
+# -----------------------------
+
+
+def test_byte_buffer_invalid_limits():
+    with pytest.raises(ValueError):
+        ByteBuffer(capacity=0, save_first=True, max_bytes=10)
+
+    with pytest.raises(ValueError):
+        ByteBuffer(capacity=3, save_first=False, max_bytes=0)
+
+
+def test_byte_buffer_first_stops_at_byte_limit():
+    buf = ByteBuffer(capacity=10, save_first=True, max_bytes=12)
+    for line in (b"abc", b"defg", b"hijk", b"l"):
+        buf.add(line)  # "hijk" does not fit; "l" is ignored after it
+    assert [bytes(line) for line in buf.get()] == [b"abc", b"defg"]
+    assert bytes(buf.get_joined()) == b"abc\ndefg\n"
+    assert buf.nbytes == 9
+
+
+def test_byte_buffer_last_keeps_suffix_within_limits():
+    buf = ByteBuffer(capacity=3, save_first=False, max_bytes=16)
+    for i in range(1, 8):
+        buf.add(b"x" * i)
+    # 3 lines would take 6 + 7 + 8 bytes
+    assert [bytes(line) for line in buf.get()] == [b"x" * 6, b"x" * 7]
+    buf.add(b"")
+    assert [bytes(line) for line in buf.get()] == [b"x" * 6, b"x" * 7, b""]
+    assert buf.nbytes == 16
+
+    buf.add(b"y" * 20)  # longer than the whole budget
+    assert len(buf) == 0 and bytes(buf.get_joined()) == b""
+
+
+def test_byte_buffer_views_do_not_block_adding():
+    buf = ByteBuffer(capacity=5, save_first=False, max_bytes=20)
+    buf.add(b"first")
+    views = buf.get()
+    joined = buf.get_joined()
+    for i in range(50):
+        buf.add(str(i).encode())
+    assert isinstance(views[0], memoryview) and isinstance(joined, memoryview)
+    assert [bytes(line) for line in buf.get()] == [b"45", b"46", b"47", b"48", b"49"]
+    buf.clear()
+    assert len(buf) == 0 and buf.get() == []
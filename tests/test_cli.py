@@ -0,0 +1,161 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from src.cli import filter_batch, filter_logs, split_ranges
+from src.filter import Filter
+from src.matcher import Matcher
+
+
+def make_filters():
+    return {
+        "se": Filter([{"reg": False, "keyword": "se"}], True),
+        "est&amet": Filter([{"reg": True, "keyword": "est"}, {"reg": True, "keyword": "amet"}], True),
+        "elitr|amet": Filter([{"reg": True, "keyword": "elitr"}, {"reg": True, "keyword": "amet"}], False),
+    }
+
+
+def write_log(path, repeat=50):
+    lines = [
+        "Lorem ipsum dolor sit amet",
+        "consetetur sadipscing elitr",
+        "",
+        "sed diam voluptua",
+        "no sea takimata sanctus est Lorem ipsum dolor sit amet",
+    ]
+    path.write_text("\n".join(f"{i} {line}" for i in range(repeat) for line in lines), encoding="utf-8")
+
+
+def read_outputs(output_dir):
+    return {p.name: p.read_text(encoding="utf-8") for p in sorted(output_dir.iterdir())}
+
+
+def test_split_ranges_start_at_lines(tmp_path):
+    log = tmp_path / "log.txt"
+    write_log(log)
+    data = log.read_bytes()
+
+    ranges = split_ranges(log, 7)
+
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == len(data)
+    for (_, end), (start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[start - 1 : start] == b"\n"
+
+
+def test_split_ranges_small_file(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_text("one line", encoding="utf-8")
+
+    assert split_ranges(log, 4) == [(0, 8)]
+
+
+def test_filter_logs_parallel_matches_serial(tmp_path):
+    log = tmp_path / "log.txt"
+    write_log(log)
+
+    filter_logs(make_filters(), log, tmp_path / "serial")
+    filter_logs(make_filters(), log, tmp_path / "parallel", jobs=3)
+
+    serial = read_outputs(tmp_path / "serial")
+    assert serial["se.txt"]
+    assert read_outputs(tmp_path / "parallel") == serial
+
+
+def test_filter_logs_mmap_matches_serial(tmp_path):
+    log = tmp_path / "log.txt"
+    write_log(log)
+
+    filter_logs(make_filters(), log, tmp_path / "serial")
+    filter_logs(make_filters(), log, tmp_path / "mmap", use_mmap=True)
+    filter_logs(make_filters(), log, tmp_path / "both", jobs=3, use_mmap=True)
+
+    serial = read_outputs(tmp_path / "serial")
+    assert read_outputs(tmp_path / "mmap") == serial
+    assert read_outputs(tmp_path / "both") == serial
+
+
+def test_filter_logs_matcher_learns_regex_order(tmp_path, monkeypatch):
+    monkeypatch.setattr(Matcher, "LEARN_LINES", 50)
+    log = tmp_path / "log.txt"
+    write_log(log)
+    filters = make_filters()
+
+    filter_logs(filters, log, tmp_path / "learned")
+
+    # "amet" hits more lines than "elitr", so the any-match filter checks it first
+    matcher = Matcher.cached(filters)
+    assert matcher._plans[2][2] == ("amet", "elitr")
+    filter_logs(make_filters(), log, tmp_path / "fresh")
+    assert read_outputs(tmp_path / "learned") == read_outputs(tmp_path / "fresh")
+
+
+def test_filter_logs_mmap_empty_file(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"")
+
+    filter_logs(make_filters(), log, tmp_path / "out", use_mmap=True)
+
+    assert read_outputs(tmp_path / "out") == {"se.txt": "", "est_and_amet.txt": "", "elitr_or_amet.txt": ""}
+
+
+def test_filter_batch_per_file_and_merged(tmp_path):
+    logs = tmp_path / "logs"
+    (logs / "b").mkdir(parents=True)
+    write_log(logs / "a.log", repeat=3)
+    write_log(logs / "b" / "a.log", repeat=5)
+    (logs / "a.log.lfidx").write_bytes(b"not a log")
+
+    summaries = filter_batch(make_filters(), logs, tmp_path / "per_file", jobs=2)
+    assert [(s["file"], s["lines"], s["error"]) for s in summaries] == [
+        (str(logs / "a.log"), 15, None),
+        (str(logs / "b" / "a.log"), 25, None),
+    ]
+    filter_logs(make_filters(), logs / "b" / "a.log", tmp_path / "single")
+    assert read_outputs(tmp_path / "per_file" / "b" / "a.log") == read_outputs(tmp_path / "single")
+
+    filter_batch(make_filters(), tmp_path / "logs" / "**" / "*.log", tmp_path / "merged", merge=True)
+    merged = read_outputs(tmp_path / "merged")
+    first = read_outputs(tmp_path / "per_file" / "a.log")
+    assert merged["se.txt"] == first["se.txt"] + read_outputs(tmp_path / "single")["se.txt"]
+
+
+def test_filter_batch_reports_failed_files(tmp_path):
+    write_log(tmp_path / "good.log", repeat=2)
+    (tmp_path / "bad.log").write_bytes(b"\x1f\x8b not really gzip")
+
+    summaries = filter_batch(make_filters(), tmp_path / "*.log", tmp_path / "out")
+
+    assert summaries[0]["error"] is not None
+    assert summaries[1]["error"] is None and summaries[1]["lines"] == 10
+
+
+def test_filter_batch_skips_output_dir_inside_source(tmp_path):
+    write_log(tmp_path / "a.log", repeat=2)
+
+    filter_batch(make_filters(), tmp_path, tmp_path / "out")
+    # The outputs of the first run are not read as inputs by the second
+    summaries = filter_batch(make_filters(), tmp_path, tmp_path / "out")
+
+    assert [s["file"] for s in summaries] == [str(tmp_path / "a.log")]
+    assert read_outputs(tmp_path / "out" / "a.log")["se.txt"] != ""
+
+
+def test_cli_import_stays_minimal():
+    # Plain CLI runs must not pay for the GUI or for optional modes
+    code = "import sys, src.cli; print(' '.join(sorted(sys.modules)))"
+    root = Path(__file__).resolve().parent.parent
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    modules = result.stdout.split()
+    for name in ("tkinter", "multiprocessing", "mmap", "gzip", "hashlib", "src.bitmap", "src.gui", "src.profiling"):
+        assert name not in modules
+
+
+def test_select_mode():
+    from main import select_mode
+
+    argv = ["main.py", "--cli"]
+    assert select_mode(argv) == ("cli", True) and argv == ["main.py"]
+    assert select_mode(["main.py", "--gui"]) == ("gui", True)
+    assert select_mode(["main.py", "log.txt"]) == ("cli", False)
@@ -0,0 +1,56 @@
+import bz2
+import gzip
+import lzma
+
+import pytest
+
+from src.cli import filter_logs
+from src.compression import detect_compression, open_log, open_output
+from src.filter import Filter
+
+DATA = b"".join(b"%d amet\nsed %d\n" % (i, i) for i in range(5000))
+
+
+@pytest.mark.parametrize(
+    "fmt, compress",
+    [("gzip", gzip.compress), ("bz2", bz2.compress), ("xz", lzma.compress)],
+)
+def test_open_log_decompresses(tmp_path, fmt, compress):
+    log = tmp_path / "log"
+    log.write_bytes(compress(DATA))
+
+    assert detect_compression(log) == fmt
+    with open_log(log) as f:
+        assert f.read() == DATA
+
+
+def test_open_log_plain(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(DATA)
+
+    assert detect_compression(log) is None
+    with open_log(log) as f:
+        assert f.seekable()
+        assert f.read() == DATA
+
+
+def test_open_output_appends_suffix(tmp_path):
+    with open_output(tmp_path / "out.txt", "gzip") as f:
+        f.write("amet\n")
+
+    assert gzip.decompress((tmp_path / "out.txt.gz").read_bytes()) == b"amet\n"
+
+
+def test_filter_logs_compressed_input_and_output(tmp_path):
+    plain = tmp_path / "log.txt"
+    plain.write_bytes(DATA)
+    packed = tmp_path / "log.txt.gz"
+    packed.write_bytes(gzip.compress(DATA))
+    filters = {"amet": Filter([{"reg": False, "keyword": "amet"}], True)}
+
+    filter_logs(filters, plain, tmp_path / "plain")
+    filter_logs(filters, packed, tmp_path / "packed", jobs=2, compression="gzip")
+
+    expected = (tmp_path / "plain" / "amet.txt").read_bytes()
+    assert expected.count(b"\n") == 5000
+    assert gzip.decompress((tmp_path / "packed" / "amet.txt.gz").read_bytes()) == expected
@@ -0,0 +1,72 @@
+from src.cli import filter_logs
+from src.context import ContextTracker
+from src.filter import Filter
+from src.loader import FileLoader
+
+
+def make_filters():
+    return {
+        "error": Filter([{"reg": False, "keyword": "error"}], True, before=2, after=1),
+        "warn": Filter([{"reg": False, "keyword": "warn"}], True),
+    }
+
+
+def run(tracker, filters, lines):
+    out = {name: [] for name in filters}
+    names = list(filters)
+    for line in lines:
+        matched = [idx for idx, flt in enumerate(filters.values()) if flt.match(line)]
+        for idx, item in tracker.add(line, matched):
+            out[names[idx]].append(item)
+    return out
+
+
+def test_context_merges_overlapping_windows():
+    filters = make_filters()
+    lines = ["a", "b", "c", "error 1", "d", "error 2", "e", "f", "g", "h", "warn", "error 3"]
+
+    out = run(ContextTracker(filters), filters, lines)
+
+    assert out["error"] == ["b", "c", "error 1", "d", "error 2", "e", "h", "warn", "error 3"]
+    assert out["warn"] == ["warn"]
+
+
+def test_context_byte_budget():
+    filters = make_filters()
+    lines = ["a", "x" * 30, "b", "error 1", "c", "d", "é", "error 2"]
+
+    out = run(ContextTracker(filters, max_bytes=20), filters, lines)
+
+    # The long line does not fit the budget, so it never waits
+    assert out["error"] == ["b", "error 1", "c", "d", "é", "error 2"]
+    out = run(ContextTracker(filters, max_bytes=3), filters, ["a", "b", "error"])
+    assert out["error"] == ["b", "error"]
+
+
+def test_context_only_when_configured():
+    assert ContextTracker.for_filters({"warn": Filter([{"reg": False, "keyword": "warn"}], True)}) is None
+
+
+def test_filter_logs_context(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_text("a\nb\n\nerror 1\nc\nd\ne\nerror 2\n", encoding="utf-8")
+
+    filter_logs(make_filters(), log, tmp_path / "out", jobs=2, use_mmap=True)
+
+    assert (tmp_path / "out" / "error.txt").read_text(encoding="utf-8") == "a\nb\nerror 1\nc\nd\ne\nerror 2\n"
+
+
+def test_loader_context_offsets(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"a\nb\nerror\nc\nd\n")
+
+    loader = FileLoader(log, make_filters(), keep_original=False, use_index=True, batch_lines=10)
+    loader.start()
+    loader.join()
+    offsets = []
+    while not loader.messages.empty():
+        kind, payload = loader.messages.get()
+        if kind == "batch":
+            offsets.extend(payload[2]["error"])
+
+    assert offsets == [0, 2, 4, 10]
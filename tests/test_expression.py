@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from src.expression import ExpressionFilter, build_expression_filters
+from src.filter import Filter
+from src.matcher import Matcher
+from src.utils import load_filters
+
+LINES = [
+    "Lorem ipsum dolor sit amet",
+    "consetetur sadipscing elitr",
+    "sed diam voluptua",
+    "no sea takimata sanctus est Lorem ipsum dolor sit amet",
+    "nothing here",
+    "id=42 elitr",
+]
+
+
+def build(settings):
+    filters = {s["name"]: None if "expression" in s else Filter(s["filters"], s["all_match"]) for s in settings}
+    build_expression_filters(settings, filters)
+    return filters
+
+
+SETTINGS = [
+    {"name": "se", "filters": [{"reg": False, "keyword": "se"}], "all_match": True},
+    {
+        "name": "(se|elitr)&!amet",
+        "expression": {
+            "and": [
+                {"or": [{"filter": "se"}, {"keyword": "elitr"}]},
+                {"not": {"reg": True, "keyword": "am+et"}},
+            ]
+        },
+    },
+    {"name": "not se", "expression": {"not": {"filter": "se"}}},
+    {"name": "id|amet", "expression": {"or": [{"reg": True, "keyword": r"id=\d+"}, {"filter": "amet"}]}},
+    {"name": "amet", "filters": [{"reg": True, "keyword": "am+et"}], "all_match": True},
+]
+
+
+def test_expression_filter_match():
+    filters = build(SETTINGS)
+
+    assert isinstance(filters["not se"], ExpressionFilter)
+    assert [line for line in LINES if filters["(se|elitr)&!amet"].match(line)] == [LINES[1], LINES[2], LINES[5]]
+    assert [line for line in LINES if filters["not se"].match(line)] == [LINES[0], LINES[4], LINES[5]]
+    assert [line for line in LINES if filters["id|amet"].match(line)] == [LINES[0], LINES[3], LINES[5]]
+
+
+def test_matcher_shares_expression_nodes():
+    filters = build(SETTINGS)
+    matcher = Matcher(filters)
+
+    for line in LINES:
+        expected = [idx for idx, flt in enumerate(filters.values()) if flt.match(line)]
+        assert matcher.match(line) == expected
+        assert Matcher(filters, binary=True).match(line.encode("utf-8")) == expected
+
+    # "se" and "am+et" appear in several filters but are one node each
+    leaves = [node for node in matcher._nodes if node[0] in ("sub", "reg")]
+    assert len(leaves) == len(set(leaves)) == 4
+    # "not se" matches lines without any keyword
+    assert matcher.scan_gate is None
+
+
+def test_expression_errors():
+    with pytest.raises(ValueError, match="refers to itself"):
+        build([{"name": "a", "expression": {"not": {"filter": "b"}}}, {"name": "b", "expression": {"filter": "a"}}])
+    with pytest.raises(ValueError, match="unknown filter"):
+        build([{"name": "a", "expression": {"filter": "missing"}}])
+
+
+def test_load_filters_with_expressions(tmp_path):
+    entry = tmp_path / "filters.json"
+    entry.write_text(json.dumps(SETTINGS), encoding="utf-8")
+
+    filters = load_filters({"entry_config": str(entry)})
+
+    assert list(filters) == [s["name"] for s in SETTINGS]
+    assert filters["id|amet"].match("id=7")
@@ -1,4 +1,4 @@
-from src.filter import Filter
+from src.filter import Filter, required_literals
 from src.utils import make_name_filename
 
 
@@ -68,6 +68,51 @@ def test_filter_any():
     assert f.match("swich")
 
 
+def test_filter_plan_orders_by_hit_rate():
+    settings = [
+        {"reg": True, "keyword": "common"},
+        {"reg": True, "keyword": "rare"},
+    ]
+    sample = ["common"] * 9 + ["common rare"]
+
+    f_all = Filter(settings, True)
+    f_all.plan(sample)
+    f_any = Filter(settings, False)
+    f_any.plan(sample)
+
+    assert f_all.ordered_patterns == ["rare", "common"]
+    assert f_any.ordered_patterns == ["common", "rare"]
+    assert f_all.match("rare common") and not f_all.match("rare")
+    assert f_any.match("rare") and not f_any.match("neither")
+
+
+def test_filter_learns_order_online():
+    f = Filter([{"reg": True, "keyword": "a"}, {"reg": True, "keyword": "b"}], True, learn_lines=4)
+    lines = ["a", "a b", "a", "a", "b a", "b"]
+
+    assert [f.match(line) for line in lines] == [False, True, False, False, True, False]
+    assert f.ordered_patterns == ["b", "a"]
+
+
+def test_required_literals():
+    assert required_literals(r"etc:\s*-?\d+") == ["etc:"]
+    assert required_literals(r"a(bc)+d(?:e|f)?") == ["bc", "a", "d"]
+    assert required_literals(r"x(?:yz|yw)") == ["xy"]
+    assert required_literals(r"(?i:ab)cd") == ["cd"]
+    assert required_literals(r"(?i)abc") == []
+    assert required_literals(r"a|b") == []
+    assert required_literals(r"\d+") == []
+
+
+def test_filter_regex_gate():
+    f = Filter([{"reg": True, "keyword": r"id=\d+"}, {"reg": True, "keyword": r"\d{3}"}], False)
+
+    assert f.gates == ["id=", ""]
+    assert f.match("id=7")
+    assert f.match("code 404")
+    assert not f.match("id=x")
+
+
 def test_name_conversion():
     test_data = {
         "ab": "ab",
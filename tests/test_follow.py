@@ -0,0 +1,84 @@
+import threading
+import time
+
+from src.cli import follow_logs
+from src.filter import Filter
+from src.follow import FileFollower
+
+
+def lines(follower):
+    return [line for _, line in follower.poll()]
+
+
+def test_follower_reports_appended_lines(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"old\n")
+
+    follower = FileFollower(log, start=4)
+    assert lines(follower) == []
+
+    with log.open("ab") as f:
+        f.write(b"new 1\nnew ")
+    assert lines(follower) == ["new 1\n"]
+
+    with log.open("ab") as f:
+        f.write(b"2\n")
+    assert lines(follower) == ["new 2\n"]
+    follower.close()
+
+
+def test_follower_handles_truncation(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"first\nsecond\n")
+
+    follower = FileFollower(log)
+    assert lines(follower) == ["first\n", "second\n"]
+
+    log.write_bytes(b"x\n")
+    assert lines(follower) == ["x\n"]
+    assert follower.reopened
+    follower.close()
+
+
+def test_follower_handles_rotation(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"first\n")
+
+    follower = FileFollower(log)
+    assert lines(follower) == ["first\n"]
+
+    with log.open("ab") as f:
+        f.write(b"last of old\n")
+    log.rename(tmp_path / "log.txt.1")
+    log.write_bytes(b"fresh\n")
+
+    assert lines(follower) == ["last of old\n"]
+    assert lines(follower) == ["fresh\n"]
+    assert follower.reopened
+    follower.close()
+
+
+def test_follow_logs_appends_matches(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_text("amet 1\nother\n", encoding="utf-8")
+    output_dir = tmp_path / "out"
+    filters = {"amet": Filter([{"reg": False, "keyword": "amet"}], True)}
+
+    stop = threading.Event()
+    thread = threading.Thread(target=follow_logs, args=(filters, log, output_dir, 0.01, stop))
+    thread.start()
+    try:
+        with log.open("a", encoding="utf-8") as f:
+            f.write("amet 2\n")
+
+        output = output_dir / "amet.txt"
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            if output.exists() and output.read_text(encoding="utf-8") == "amet 1\namet 2\n":
+                break
+            time.sleep(0.01)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert output.read_text(encoding="utf-8") == "amet 1\namet 2\n"
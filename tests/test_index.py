@@ -0,0 +1,107 @@
+import os
+
+import src.index
+from src.cli import filter_logs
+from src.expression import ExpressionFilter
+from src.filter import Filter
+from src.index import LogIndex
+
+
+def write_log(path):
+    lines = []
+    for i in range(200):
+        lines.append(f"{i} request handled for user{i % 7}")
+        if i == 150:
+            lines.append("error: disk quota exceeded")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def test_index_selects_matching_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(src.index, "BLOCK_SIZE", 256)
+    log = tmp_path / "log.txt"
+    write_log(log)
+
+    index = LogIndex.build(log)
+    assert len(index.blocks) > 10
+    assert sum(index.line_counts) == 201
+
+    ranges = index.candidate_ranges({"quota": Filter([{"reg": False, "keyword": "quota exc"}], True)})
+    assert len(ranges) == 1
+    start, end = ranges[0]
+    assert b"disk quota exceeded" in log.read_bytes()[start:end]
+
+    assert index.candidate_ranges({"none": Filter([{"reg": False, "keyword": "missing"}], True)}) == []
+    # Regexes narrow the selection by their required literals, if they have any
+    assert index.candidate_ranges({"reg": Filter([{"reg": True, "keyword": r"quota\s+exc"}], False)}) == ranges
+    assert index.candidate_ranges({"reg": Filter([{"reg": True, "keyword": "(?i)quota"}], False)}) == [
+        (0, log.stat().st_size)
+    ]
+
+    quota_or_disk = ExpressionFilter(("and", (("sub", "error"), ("or", (("reg", r"quota\s"), ("sub", "disk"))))))
+    assert index.candidate_ranges({"expr": quota_or_disk}) == ranges
+    not_quota = ExpressionFilter(("not", ("sub", "quota")))
+    assert index.candidate_ranges({"expr": not_quota}) == [(0, log.stat().st_size)]
+
+
+def test_index_round_trip_and_staleness(tmp_path):
+    log = tmp_path / "log.txt"
+    write_log(log)
+
+    assert LogIndex.load(log) is None
+    built = LogIndex.open(log)
+    assert LogIndex.sidecar_path(log).exists()
+
+    loaded = LogIndex.load(log)
+    assert loaded.blocks == built.blocks
+    assert loaded.bitsets == built.bitsets
+
+    # Sidecars of an older format are rebuilt
+    LogIndex.sidecar_path(log).write_bytes(b'{"version": 1}\n')
+    assert LogIndex.load(log) is None
+    built.save(log)
+
+    with log.open("a", encoding="utf-8") as f:
+        f.write("one more line\n")
+    os.utime(log, ns=(built.mtime_ns + 10**9, built.mtime_ns + 10**9))
+    assert LogIndex.load(log) is None
+
+
+def test_index_size_bounded_by_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(src.index, "BLOCK_SIZE", 4096)
+    log = tmp_path / "log.txt"
+    lines = [f"request id={i * 7919}\n" for i in range(5000)]
+    lines[4321] = "error: disk quota exceeded\n"
+    log.write_text("".join(lines), encoding="utf-8")
+
+    # Unique ids add no index entries; the size only depends on the number of blocks
+    index = LogIndex.build(log)
+    assert len(index.bitsets) == len(index.blocks) * src.index.BLOCK_BITS // 8
+
+    ranges = index.candidate_ranges({"quota": Filter([{"reg": False, "keyword": "quota"}], True)})
+    assert len(ranges) == 1
+    start, end = ranges[0]
+    assert b"disk quota exceeded" in log.read_bytes()[start:end]
+    # Keywords without a whole trigram could be in any block
+    assert index.candidate_ranges({"short": Filter([{"reg": False, "keyword": "id"}], True)}) == [
+        (0, log.stat().st_size)
+    ]
+
+
+def test_filter_logs_with_index_matches_full_scan(tmp_path, monkeypatch):
+    monkeypatch.setattr(src.index, "BLOCK_SIZE", 256)
+    log = tmp_path / "log.txt"
+    write_log(log)
+    filters = {
+        "quota": Filter([{"reg": False, "keyword": "quota"}], True),
+        "user3": Filter([{"reg": False, "keyword": "user3"}, {"reg": False, "keyword": "handled"}], True),
+    }
+
+    filter_logs(filters, log, tmp_path / "full")
+    filter_logs(filters, log, tmp_path / "indexed", use_index=True)
+    filter_logs(filters, log, tmp_path / "indexed_mmap", use_index=True, use_mmap=True, jobs=2)
+
+    for name in ("quota.txt", "user3.txt"):
+        expected = (tmp_path / "full" / name).read_text(encoding="utf-8")
+        assert expected
+        assert (tmp_path / "indexed" / name).read_text(encoding="utf-8") == expected
+        assert (tmp_path / "indexed_mmap" / name).read_text(encoding="utf-8") == expected
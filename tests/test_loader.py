@@ -0,0 +1,121 @@
+from datetime import datetime
+
+from src.filter import Filter
+from src.loader import FileLoader
+
+
+def collect(loader):
+    loader.start()
+    loader.join()
+
+    offsets = {}
+    messages = []
+    while not loader.messages.empty():
+        kind, payload = loader.messages.get()
+        messages.append(kind)
+        if kind == "batch":
+            for name, batch in payload[2].items():
+                offsets.setdefault(name, []).extend(batch)
+    return messages, offsets
+
+
+def test_loader_reports_offsets_in_batches(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"amet one\nsed two\n\namet three\nfour\n")
+    filters = {"amet": Filter([{"reg": False, "keyword": "amet"}], True)}
+
+    messages, offsets = collect(FileLoader(log, filters, keep_original=True, use_index=False, batch_lines=2))
+
+    assert messages == ["batch", "batch", "batch", "done"]
+    assert offsets["amet"] == [0, 18]
+    assert offsets["original"] == [0, 9, 18, 29]
+
+
+def test_loader_cancel(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"line\n" * 100)
+    filters = {"line": Filter([{"reg": False, "keyword": "line"}], True)}
+
+    loader = FileLoader(log, filters, keep_original=False, use_index=False, batch_lines=10)
+    loader.cancel()
+    messages, _ = collect(loader)
+
+    assert messages == ["cancelled"]
+
+
+def test_loader_spools_compressed_input(tmp_path):
+    import gzip
+
+    log = tmp_path / "log.gz"
+    data = b"amet one\nsed two\namet three\n"
+    log.write_bytes(gzip.compress(data))
+    spool = tmp_path / "spool.txt"
+    filters = {"amet": Filter([{"reg": False, "keyword": "amet"}], True)}
+
+    loader = FileLoader(log, filters, keep_original=False, use_index=True, batch_lines=1, spool=spool)
+    messages, offsets = collect(loader)
+
+    assert messages[-1] == "done"
+    assert spool.read_bytes() == data
+    assert offsets["amet"] == [0, 17]
+
+
+def test_loader_time_window(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"2026-01-01 10:00:00 a\n2026-01-01 10:05:00 a\n  a trace\n2026-01-01 10:10:00 a\n")
+    filters = {"a": Filter([{"reg": False, "keyword": "a"}], True)}
+
+    loader = FileLoader(
+        log,
+        filters,
+        keep_original=False,
+        use_index=False,
+        batch_lines=10,
+        since=datetime(2026, 1, 1, 10, 1),
+        until=datetime(2026, 1, 1, 10, 5),
+    )
+    _, offsets = collect(loader)
+
+    assert offsets["a"] == [22, 44]
+
+
+def test_loader_stops_at_end(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"amet one\nsed two\namet three\n")
+    filters = {"amet": Filter([{"reg": False, "keyword": "amet"}], True)}
+
+    loader = FileLoader(log, filters, keep_original=False, use_index=False, batch_lines=10, end=17)
+    messages, offsets = collect(loader)
+
+    assert messages[-1] == "done"
+    assert offsets["amet"] == [0]
+
+
+def test_loader_follow_stops_at_last_complete_line(tmp_path):
+    from src.follow import FileFollower
+
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"first line\nERR partial wri")
+    filters = {"err": Filter([{"reg": False, "keyword": "ERR"}], True)}
+
+    loader = FileLoader(log, filters, keep_original=True, use_index=False, batch_lines=10, follow=True)
+    loader.start()
+    loader.join()
+    messages = list(loader.messages.queue)
+
+    # The unfinished line is neither reported nor counted as read
+    assert messages[-1] == ("done", 11)
+    assert [list(payload[2]["original"]) for kind, payload in messages if kind == "batch"] == [[0]]
+
+    # Without following, the unfinished line is loaded like any other
+    loader = FileLoader(log, filters, keep_original=True, use_index=False, batch_lines=10)
+    _, offsets = collect(loader)
+    assert offsets["original"] == [0, 11]
+
+    with log.open("ab") as f:
+        f.write(b"ting ERROR\n")
+    follower = FileFollower(log, start=messages[-1][1])
+    try:
+        assert list(follower.poll()) == [(11, "ERR partial writing ERROR\n")]
+    finally:
+        follower.close()
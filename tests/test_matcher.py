@@ -0,0 +1,111 @@
+from src.filter import Filter
+from src.matcher import Matcher
+
+LINES = [
+    "Lorem ipsum dolor sit amet",
+    "consetetur sadipscing elitr",
+    "sed diam voluptua",
+    "no sea takimata sanctus est Lorem ipsum dolor sit amet",
+    "prefix etc: 42 end",
+    "prefix etc: end",
+    "",
+]
+
+
+def make_filters():
+    return {
+        "se": Filter([{"reg": False, "keyword": "se"}], True),
+        "se&amet": Filter([{"reg": False, "keyword": "se"}, {"reg": False, "keyword": "amet"}], True),
+        "est&amet": Filter([{"reg": True, "keyword": "est"}, {"reg": True, "keyword": "amet"}], True),
+        "elitr|amet": Filter([{"reg": True, "keyword": "elitr"}, {"reg": True, "keyword": "amet"}], False),
+        "etc": Filter([{"reg": True, "keyword": r"etc:\s*-?\d+(?:\.\d+)?(?!$)"}], True),
+        "mixed": Filter([{"reg": False, "keyword": "diam"}, {"reg": True, "keyword": r"s\w+t"}], False),
+    }
+
+
+def test_matcher_agrees_with_filters():
+    filters = make_filters()
+    matcher = Matcher(filters)
+    ordered = list(filters.values())
+
+    for line in LINES:
+        expected = [idx for idx, flt in enumerate(ordered) if flt.match(line)]
+        assert matcher.match(line) == expected, line
+
+
+def test_matcher_names_keep_order():
+    filters = make_filters()
+    assert Matcher(filters).names == list(filters.keys())
+
+
+def test_matcher_empty_filters():
+    filters = {
+        "everything": Filter([], True),
+        "nothing": Filter([], False),
+    }
+    matcher = Matcher(filters)
+
+    assert matcher.match("anything") == [0]
+    assert matcher.match("") == [0]
+
+    # Results are the caller's own lists
+    matcher.match("first").append(1)
+    assert matcher.match("second") == [0]
+
+
+def test_matcher_backreference_without_gate():
+    filters = {
+        "a": Filter([{"reg": True, "keyword": r"(a)\1"}], True),
+        "b": Filter([{"reg": True, "keyword": r"(b)\1"}], True),
+    }
+    matcher = Matcher(filters)
+
+    assert matcher.match("xaa") == [0]
+    assert matcher.match("xbb") == [1]
+    assert matcher.match("ab") == []
+
+
+def test_matcher_binary_agrees_with_text():
+    filters = make_filters()
+    text = Matcher(filters)
+    binary = Matcher(filters, binary=True)
+
+    for line in LINES:
+        assert binary.match(line.encode("utf-8")) == text.match(line), line
+
+
+def test_scan_gate_finds_candidate_lines(tmp_path):
+    import mmap
+
+    from src.scan import iter_mmap_lines
+
+    filters = {"se": Filter([{"reg": False, "keyword": "se"}], True)}
+    matcher = Matcher(filters, binary=True)
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"abc\r\nxsey\r\nnothing\nse")
+
+    with log.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        assert list(iter_mmap_lines(mm, matcher.scan_gate)) == [b"xsey", b"se"]
+        assert list(iter_mmap_lines(mm, None)) == [b"abc", b"xsey", b"nothing", b"se"]
+        assert list(iter_mmap_lines(mm, None, 5, 11)) == [b"xsey"]
+
+
+def test_cached_matcher_reused_for_same_filters():
+    filters = make_filters()
+    matcher = Matcher.cached(filters)
+
+    assert Matcher.cached(dict(filters)) is matcher
+    assert Matcher.cached(filters, binary=True) is not matcher
+    assert Matcher.cached(make_filters()) is not matcher
+
+
+def test_matcher_learns_regex_order(monkeypatch):
+    monkeypatch.setattr(Matcher, "LEARN_LINES", 4)
+    settings = [{"reg": True, "keyword": "a"}, {"reg": True, "keyword": "b"}]
+    matcher = Matcher({"all": Filter(settings, True), "any": Filter(settings, False)})
+    lines = ["a", "a b", "a", "a", "b a", "b", "x"]
+
+    assert [matcher.match(line) for line in lines] == [[1], [0, 1], [1], [1], [0, 1], [1], []]
+    assert matcher._plans[0][2] == ("b", "a")
+    assert matcher._plans[1][2] == ("a", "b")
+    assert matcher._regex_only == [(0, True, ("b", "a")), (1, False, ("a", "b"))]
@@ -0,0 +1,65 @@
+import json
+
+from src.cli import filter_logs
+from src.filter import Filter
+from src.matcher import Matcher
+from src.profiling import FilterProfiler
+
+
+def make_filters():
+    return {
+        "amet&est": Filter([{"reg": False, "keyword": "amet"}, {"reg": True, "keyword": "est"}], True),
+        "elitr|sed": Filter([{"reg": False, "keyword": "elitr"}, {"reg": False, "keyword": "sed"}], False),
+    }
+
+
+LINES = [
+    "Lorem ipsum dolor sit amet",
+    "consetetur sadipscing elitr",
+    "sed diam voluptua",
+    "no sea takimata sanctus est Lorem ipsum dolor sit amet",
+]
+
+
+def test_profiler_matches_like_matcher():
+    filters = make_filters()
+    profiler = FilterProfiler(filters)
+    matcher = Matcher(filters)
+
+    for line in LINES:
+        assert profiler.match(line) == matcher.match(line)
+
+
+def test_profiler_counts_keywords_with_short_circuit():
+    profiler = FilterProfiler(make_filters(), slowest=2)
+    for line in LINES:
+        profiler.match(line)
+
+    stats = {entry["name"]: entry for entry in profiler.to_dict()["filters"]}
+    keywords = {kw["keyword"]: kw for kw in stats["amet&est"]["keywords"]}
+
+    assert stats["amet&est"]["evaluations"] == 4
+    assert stats["amet&est"]["matches"] == 1
+    assert stats["elitr|sed"]["matches"] == 2
+    # The regex only runs on lines containing "amet"
+    assert (keywords["amet"]["evaluations"], keywords["amet"]["matches"]) == (4, 2)
+    assert (keywords["est"]["evaluations"], keywords["est"]["matches"]) == (2, 1)
+    assert keywords["est"]["kind"] == "regex"
+    assert len(stats["amet&est"]["slowest_lines"]) == 2
+
+
+def test_filter_logs_profile_report(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_text("\n".join(LINES * 10), encoding="utf-8")
+    filters = make_filters()
+    profiler = FilterProfiler(filters)
+
+    filter_logs(filters, log, tmp_path / "out", jobs=2, use_mmap=True, profiler=profiler)
+    report_path = tmp_path / "profile.json"
+    profiler.write_report(report_path)
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert [entry["evaluations"] for entry in report["filters"]] == [40, 40]
+    counts = sorted(p.read_text(encoding="utf-8").count("\n") for p in (tmp_path / "out").iterdir())
+    assert counts == [10, 20]
+    assert "amet&est" in profiler.report()
@@ -0,0 +1,112 @@
+import threading
+from array import array
+
+from src.refine import LineSearch, Refinement, search_lines
+
+
+def write_log(path, count=20):
+    lines = [f"{i} {'error' if i % 5 == 0 else 'info'} request{i % 3}" for i in range(count)]
+    data = "\n".join(lines).encode("utf-8")
+    path.write_bytes(data)
+    offsets = array("Q", [0])
+    offsets.extend(i + 1 for i, byte in enumerate(data) if byte == ord("\n"))
+    return lines, offsets
+
+
+def search(refinement, path):
+    """Run the searches `refinement` asks for until its result is complete; returns how many lines were searched."""
+    searched = 0
+    with path.open("rb") as f:
+        while (offsets := refinement.next_search()) is not None:
+            searched += len(offsets)
+            refinement.finish(search_lines(f, offsets, refinement.query))
+    return searched
+
+
+def test_search_lines_matches_line_by_line(tmp_path):
+    log = tmp_path / "log.txt"
+    lines, offsets = write_log(log, 200)
+
+    with log.open("rb") as f:
+        for query in (b"error", b"request2", b"9 info", b"0\n1", b"missing"):
+            expected = [offset for offset, line in zip(offsets, lines) if query.decode() in line]
+            assert list(search_lines(f, offsets, query)) == expected
+        # Only the lines given are searched, not those between them
+        assert list(search_lines(f, offsets[1::2], b"error")) == list(offsets[5::10])
+
+
+def test_search_lines_cancelled(tmp_path):
+    log = tmp_path / "log.txt"
+    _, offsets = write_log(log)
+    cancel = threading.Event()
+    cancel.set()
+
+    with log.open("rb") as f:
+        assert search_lines(f, offsets, b"error", cancel) is None
+
+
+def test_refinement_reuses_results(tmp_path):
+    log = tmp_path / "log.txt"
+    lines, offsets = write_log(log, 100)
+    refinement = Refinement()
+    refinement.add(offsets[:60])
+
+    refinement.set_query(b"error")
+    assert search(refinement, log) == 60
+    assert len(refinement.offsets) == 12
+
+    # Extending the query searches the previous result only
+    refinement.set_query(b"error request1")
+    assert search(refinement, log) == 12
+    assert [lines[offsets.index(o)] for o in refinement.offsets] == [
+        "10 error request1",
+        "25 error request1",
+        "40 error request1",
+        "55 error request1",
+    ]
+
+    # Going back to a kept query shows it at once; only added lines are searched
+    refinement.add(offsets[60:])
+    refinement.set_query(b"error")
+    assert len(refinement.offsets) == 12
+    assert search(refinement, log) == 40
+    assert len(refinement.offsets) == 20
+
+    refinement.set_query(b"")
+    assert refinement.offsets is refinement.all
+    assert refinement.next_search() is None
+
+
+def test_refinement_new_query_keeps_lines_until_searched():
+    refinement = Refinement()
+    refinement.add([0, 10, 20])
+
+    refinement.set_query(b"x")
+    assert refinement.next_search() == array("Q", [0, 10, 20])
+    assert refinement.searching
+    assert len(refinement.offsets) == 3
+
+    refinement.finish(array("Q", [10]))
+    assert not refinement.searching
+    assert list(refinement.offsets) == [10]
+
+    refinement.reset()
+    assert refinement.query == b"x"
+    assert len(refinement.offsets) == 0
+    assert refinement.next_search() is None
+
+
+def test_line_search_thread(tmp_path):
+    log = tmp_path / "log.txt"
+    _, offsets = write_log(log)
+
+    search = LineSearch(log, offsets, b"error")
+    search.start()
+    search.join()
+    assert list(search.result) == list(offsets[::5])
+
+    failed = LineSearch(tmp_path / "missing.txt", offsets, b"error")
+    failed.start()
+    failed.join()
+    assert failed.result is None
+    assert isinstance(failed.error, OSError)
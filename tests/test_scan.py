@@ -0,0 +1,33 @@
+import src.scan
+from src.scan import iter_offset_lines, iter_range_lines, line_start, read_offset_lines
+
+
+def test_offset_lines_point_at_line_starts(tmp_path):
+    log = tmp_path / "log.txt"
+    data = b"first\r\nsecond\n\nthird"
+    log.write_bytes(data)
+
+    with log.open("rb") as f:
+        pairs = list(iter_offset_lines(f))
+        assert pairs == [(0, "first\n"), (7, "second\n"), (14, "\n"), (15, "third")]
+        assert list(iter_offset_lines(f, 7, 15)) == [(7, "second\n"), (14, "\n")]
+        assert [line for _, line in pairs] == list(iter_range_lines(f, 0, len(data)))
+
+
+def test_read_offset_lines_near_and_far(tmp_path, monkeypatch):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"first\r\nsecond\n\nthird")
+
+    with log.open("rb") as f:
+        assert read_offset_lines(f, [0, 7, 14, 15]) == [b"first", b"second", b"", b"third"]
+        monkeypatch.setattr(src.scan, "READ_SPAN", 4)
+        assert read_offset_lines(f, [0, 7, 15]) == [b"first", b"second", b"third"]
+        assert read_offset_lines(f, []) == []
+
+
+def test_line_start(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_bytes(b"one\ntwo\n" + b"x" * 70000)
+
+    with log.open("rb") as f:
+        assert [line_start(f, pos) for pos in (0, 2, 4, 6, 8, 70008)] == [0, 0, 4, 4, 8, 8]
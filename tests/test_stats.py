@@ -0,0 +1,92 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+from src.cli import filter_logs
+from src.filter import Filter
+from src.stats import MatchStats
+
+START = datetime(2026, 1, 1, 10, 0)
+
+
+def write_log(path):
+    lines = []
+    for i in range(60):
+        stamp = (START + timedelta(seconds=20 * i)).isoformat(sep=" ", timespec="milliseconds")
+        lines.append(f"{stamp} {'ERROR' if i % 4 == 0 else 'INFO'} event {i}")
+        if i % 4 == 0:
+            # Continuation lines belong to the entry above
+            lines.append("    at handler ERROR trace")
+    path.write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+    return lines
+
+
+def make_filters():
+    return {
+        "error": Filter([{"reg": False, "keyword": "ERROR"}], True),
+        "trace": Filter([{"reg": True, "keyword": r"at \w+"}], True),
+        "none": Filter([{"reg": False, "keyword": "missing"}], True),
+    }
+
+
+def test_stats_counts_match_outputs(tmp_path):
+    log = tmp_path / "log.txt"
+    lines = write_log(log)
+    filters = make_filters()
+    filter_logs(filters, log, tmp_path / "out")
+
+    stats = MatchStats(filters)
+    filter_logs(filters, log, tmp_path / "stats", stats=stats)
+
+    assert not (tmp_path / "stats").exists()
+    summary = stats.to_dict()
+    assert summary["lines"] == len(lines)
+    for name, entry in summary["filters"].items():
+        assert entry["count"] == len((tmp_path / "out" / f"{name}.txt").read_text(encoding="utf-8").splitlines())
+    data = log.read_bytes()
+    assert summary["filters"]["error"]["first_offset"] == 0
+    assert data[summary["filters"]["trace"]["last_offset"] :].startswith(b"    at handler")
+    assert summary["filters"]["none"] == {"count": 0, "first_offset": None, "last_offset": None}
+
+
+def test_stats_histogram_per_minute(tmp_path):
+    log = tmp_path / "log.txt"
+    write_log(log)
+    stats = MatchStats(make_filters(), histogram=True)
+    filter_logs(make_filters(), log, tmp_path / "out", stats=stats)
+
+    error = stats.to_dict()["filters"]["error"]
+    # An entry every 20 s, every fourth one an error with an error trace line
+    assert sum(error["minutes"].values()) == error["count"] == 30
+    assert list(error["minutes"])[:5] == [f"2026-01-01T10:0{m}" for m in (0, 1, 2, 4, 5)]
+    assert set(error["minutes"].values()) == {2}
+    assert error["first_time"] == "2026-01-01T10:00:00"
+    assert error["last_time"] == "2026-01-01T10:18:40"
+
+    table = list(csv.reader(io.StringIO(stats.to_csv())))
+    assert table[0][:6] == ["filter", "count", "first_offset", "last_offset", "first_time", "last_time"]
+    assert table[0][6:] == list(error["minutes"])
+    assert table[1][6:] == ["2"] * len(error["minutes"])
+    assert [row[0] for row in table[1:]] == ["error", "trace", "none"]
+
+
+def test_stats_compressed_time_window(tmp_path):
+    log = tmp_path / "log.txt"
+    write_log(log)
+    gz = tmp_path / "log.txt.gz"
+    gz.write_bytes(gzip.compress(log.read_bytes()))
+    since, until = START + timedelta(minutes=5), START + timedelta(minutes=9, seconds=59)
+
+    results = []
+    for path in (log, gz):
+        stats = MatchStats(make_filters(), histogram=True)
+        filter_logs(make_filters(), path, tmp_path / "out", since=since, until=until, stats=stats)
+        results.append(stats.to_dict())
+    assert results[0] == results[1]
+    assert list(results[0]["filters"]["trace"]["minutes"]) == [f"2026-01-01T10:0{m}" for m in (5, 6, 8, 9)]
+
+    report = tmp_path / "stats.json"
+    stats.write_report(report)
+    assert json.loads(report.read_text(encoding="utf-8")) == results[1]
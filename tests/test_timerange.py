@@ -0,0 +1,77 @@
+import gzip
+from datetime import datetime, timedelta
+
+from src.cli import filter_logs
+from src.filter import Filter
+from src.timerange import TimestampParser, iter_time_window, time_window
+
+START = datetime(2026, 1, 1, 10, 0)
+
+
+def write_log(path, minutes=120):
+    lines = []
+    for i in range(minutes):
+        stamp = (START + timedelta(minutes=i)).isoformat(sep=" ", timespec="milliseconds")
+        lines.append(f"{stamp} INFO minute {i}")
+        if i % 7 == 0:
+            # Continuation lines belong to the entry above
+            lines.append(f"    trace of minute {i}")
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return lines
+
+
+def expected_lines(lines, first, last):
+    """Lines of the minutes [first, last] with their continuation lines."""
+    keep = []
+    minute = None
+    for line in lines:
+        if not line.startswith(" "):
+            minute = int(line.rsplit(" ", 1)[1])
+        if first <= minute <= last:
+            keep.append(line)
+    return keep
+
+
+def test_parser_formats():
+    assert TimestampParser().parse(b"2026-01-01T10:00:00,5 x") == datetime(2026, 1, 1, 10, 0, 0, 500000)
+    assert TimestampParser().parse("no stamp") is None
+    parser = TimestampParser(r"^\[(.+?)\]", "%d/%m/%Y %H:%M")
+    assert parser.parse("[02/01/2026 10:30] x") == datetime(2026, 1, 2, 10, 30)
+
+
+def test_time_window_binary_search(tmp_path):
+    log = tmp_path / "log.txt"
+    lines = write_log(log)
+    parser = TimestampParser()
+
+    start, end = time_window(log, parser, START + timedelta(minutes=14), START + timedelta(minutes=29, seconds=30))
+    window = log.read_bytes()[start:end].decode("utf-8").splitlines()
+    assert window == expected_lines(lines, 14, 29)
+
+    assert time_window(log, parser, since=START + timedelta(days=1)) == (log.stat().st_size,) * 2
+    assert time_window(log, parser, until=START - timedelta(days=1)) == (0, 0)
+    assert time_window(log, parser) == (0, log.stat().st_size)
+
+
+def test_iter_time_window_matches_binary_search(tmp_path):
+    log = tmp_path / "log.txt"
+    lines = write_log(log)
+    since, until = START + timedelta(minutes=50), START + timedelta(minutes=70)
+
+    assert list(iter_time_window(lines, TimestampParser(), since, until)) == expected_lines(lines, 50, 70)
+
+
+def test_filter_logs_time_window(tmp_path):
+    log = tmp_path / "log.txt"
+    lines = write_log(log)
+    gz = tmp_path / "log.txt.gz"
+    gz.write_bytes(gzip.compress(log.read_bytes()))
+    filters = {"trace": Filter([{"reg": False, "keyword": "trace"}], True)}
+    since, until = START + timedelta(minutes=20), START + timedelta(minutes=59)
+    expected = "".join(line + "\n" for line in expected_lines(lines, 20, 59) if "trace" in line)
+
+    for name, kwargs in {"plain": {}, "jobs": {"jobs": 3}, "mmap": {"use_mmap": True}}.items():
+        filter_logs(filters, log, tmp_path / name, since=since, until=until, **kwargs)
+        assert (tmp_path / name / "trace.txt").read_text(encoding="utf-8") == expected
+    filter_logs(filters, gz, tmp_path / "gz", since=since, until=until)
+    assert (tmp_path / "gz" / "trace.txt").read_text(encoding="utf-8") == expected
@@ -0,0 +1,55 @@
+import json
+
+from src import utils
+from src.filter import Filter
+from src.matcher import Matcher
+
+SETTINGS = [
+    {"name": "se", "all_match": True, "filters": [{"reg": False, "keyword": "se"}]},
+    {"name": "amet", "all_match": True, "filters": [{"reg": True, "keyword": "am+et"}]},
+]
+
+
+def test_load_filters_cached_until_entry_changes(tmp_path):
+    entry = tmp_path / "filters.json"
+    entry.write_text(json.dumps(SETTINGS), encoding="utf-8")
+    config = {"entry_config": str(entry)}
+
+    filters = utils.load_filters(config)
+    again = utils.load_filters(config)
+    assert again == filters and again is not filters
+    assert all(again[name] is flt for name, flt in filters.items())
+    assert Matcher.cached(again) is Matcher.cached(filters)
+
+    entry.write_text(json.dumps(SETTINGS[:1]), encoding="utf-8")
+    changed = utils.load_filters(config)
+    assert list(changed) == ["se"]
+    assert changed["se"] is not filters["se"]
+
+
+def test_load_config_skips_fix_when_unchanged(tmp_path, monkeypatch):
+    monkeypatch.setattr(utils, "FOLDER_CODE", tmp_path)
+    fixes = []
+    fix_config = utils.fix_config
+    monkeypatch.setattr(utils, "fix_config", lambda path: fixes.append(path) or fix_config(path))
+
+    config = utils.load_config()
+    assert config == utils.DEFAULT_CONFIG
+    config["max_line"] = 1
+    assert utils.load_config()["max_line"] == utils.DEFAULT_CONFIG["max_line"]
+    assert len(fixes) == 1
+
+    (tmp_path / "config.json").write_text(json.dumps({"max_line": 5}), encoding="utf-8")
+    assert utils.load_config()["max_line"] == 5
+    assert len(fixes) == 2
+    assert json.loads((tmp_path / "config.json").read_text(encoding="utf-8"))["use_index"] is False
+
+
+def test_match_filters_reuses_unchanged_and_renamed():
+    def flt(keyword, all_match=True):
+        return Filter([{"reg": False, "keyword": keyword}], all_match)
+
+    old = {"a": flt("x"), "b": flt("y"), "c": flt("z"), "gone": flt("w")}
+    new = {"b": flt("y", all_match=False), "a": flt("x"), "renamed": flt("z"), "added": flt("v")}
+
+    assert utils.match_filters(old, new) == {"b": None, "a": "a", "renamed": "c", "added": None}
@@ -0,0 +1,37 @@
+import gzip
+
+import pytest
+
+from src.writer import OutputWriter
+
+
+def test_writer_flushes_in_order(tmp_path):
+    paths = [tmp_path / "a.txt", tmp_path / "b.txt"]
+
+    with OutputWriter(paths, flush_lines=3) as writer:
+        for i in range(10):
+            writer.buffers[i % 2].append(f"line {i} ä")
+            writer.maybe_flush()
+
+    assert paths[0].read_text(encoding="utf-8") == "".join(f"line {i} ä\n" for i in range(0, 10, 2))
+    assert paths[1].read_text(encoding="utf-8") == "".join(f"line {i} ä\n" for i in range(1, 10, 2))
+
+
+def test_writer_flush_wait_and_compression(tmp_path):
+    writer = OutputWriter([tmp_path / "a.txt"], compression="gzip", binary=True)
+    writer.buffers[0].extend([b"one", b"two"])
+    writer.flush(wait=True)
+    writer.buffers[0].append(b"three")
+    writer.close()
+
+    with gzip.open(tmp_path / "a.txt.gz", "rb") as f:
+        assert f.read() == b"one\ntwo\nthree\n"
+
+
+def test_writer_reports_errors(tmp_path):
+    writer = OutputWriter([tmp_path / "a.txt"], binary=True)
+    # str lines cannot be joined by a binary writer
+    writer.buffers[0].append("not bytes")
+
+    with pytest.raises(TypeError):
+        writer.close()